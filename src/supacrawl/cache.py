@@ -2,20 +2,44 @@
 
 Provides local caching of scraped content to speed up repeated requests.
 Cache respects max_age parameter for cache freshness control.
+
+Entries are stored as JSON by default. ``CacheManager(entry_format="msgpack")``
+stores them as MessagePack via ``ormsgpack`` (``supacrawl[msgpack]``), which is
+smaller on disk and much faster to decode on every hit. Either manager reads
+both encodings: the first byte tells them apart (``{`` for JSON, a map marker
+for MessagePack), so switching format never invalidates existing entries.
 """
 
 import hashlib
 import json
 import logging
 import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel
 
+from supacrawl.exceptions import ValidationError
+
 LOGGER = logging.getLogger(__name__)
 
+# Worker threads for reading cache entries in bulk (stats, prune). The reads are
+# I/O bound and release the GIL, so a small pool hides per-file latency on large
+# caches without competing with the event loop for CPU.
+_SCAN_WORKERS = 8
+
+# Unsaved index mutations tolerated before the index is written back to disk.
+# The rest are flushed by close() or when the manager is garbage-collected, so a
+# long crawl no longer rewrites a growing index.json on every set().
+_INDEX_FLUSH_EVERY = 64
+
+# Units for _format_size, one per power of 1024
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
 
 class CacheEntry(BaseModel):
     """A cached scrape result."""
@@ -23,10 +47,109 @@ class CacheEntry(BaseModel):
     url: str
     cached_at: str  # ISO format timestamp
     expires_at: str  # ISO format timestamp
+    expires_epoch: int | None = None  # expires_at as Unix seconds; None on legacy entries
     content_hash: str | None = None  # SHA256 of markdown content for change tracking
     response: dict[str, Any]  # Serialised ScrapeResult
 
 
+CacheFormat = Literal["json", "msgpack"]
+
+
+def _is_expired(entry: CacheEntry, now: float) -> bool:
+    """Check expiry against a ``time.time()`` value.
+
+    Compares the stored epoch directly, so the read path never parses ISO
+    timestamps; entries written before ``expires_epoch`` existed fall back
+    to parsing ``expires_at``.
+    """
+    if entry.expires_epoch is not None:
+        return now > entry.expires_epoch
+    return now > datetime.fromisoformat(entry.expires_at).timestamp()
+
+
+def _decode_entry(raw: bytes) -> CacheEntry:
+    """Decode a cache file in either encoding, sniffing the first byte.
+
+    Entries keep the ``.json`` suffix whatever their encoding, so the file name
+    depends only on the URL: a manager looks up one path, never probes two,
+    and a re-``set()`` in the other encoding overwrites the old file instead of
+    leaving a stale twin. A JSON entry is always an object (``{``); MessagePack
+    maps start with a fixmap/map16/map32 marker (``0x80``-``0x8f``, ``0xde``,
+    ``0xdf``), so the first byte is unambiguous.
+    """
+    if raw[:1] == b"{":
+        return CacheEntry.model_validate_json(raw)
+    import ormsgpack
+
+    return CacheEntry.model_validate(ormsgpack.unpackb(raw))
+
+
+def _read_index(path: Path) -> dict[str, str]:
+    """Read ``index.json``, treating a missing or unreadable file as empty."""
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError) as e:
+        LOGGER.warning(f"Failed to load cache index: {e}")
+        return {}
+
+
+class _IndexJournal:
+    """Index mutations not yet written to ``index.json``.
+
+    Kept apart from :class:`CacheManager` so the ``weakref.finalize`` callback
+    that flushes it does not keep the manager alive. Flushing merges into the
+    index on disk rather than overwriting it, so managers sharing a cache
+    directory do not drop each other's entries.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.updates: dict[str, str] = {}
+        self.removed: set[str] = set()
+        self.pending = 0
+
+    def record(self, url: str, cache_key: str | None) -> None:
+        """Record that ``url`` now maps to ``cache_key``, or was removed when None."""
+        if cache_key is None:
+            self.updates.pop(url, None)
+            self.removed.add(url)
+        else:
+            self.removed.discard(url)
+            self.updates[url] = cache_key
+        self.pending += 1
+
+    def reset(self) -> None:
+        """Forget every unsaved mutation."""
+        self.updates.clear()
+        self.removed.clear()
+        self.pending = 0
+
+    def flush(self) -> dict[str, str] | None:
+        """Apply unsaved mutations to the on-disk index and write it back.
+
+        Returns:
+            The merged index, or None if there was nothing to write.
+        """
+        if not self.pending:
+            return None
+        index = _read_index(self.path)
+        for url in self.removed:
+            index.pop(url, None)
+        index.update(self.updates)
+        self.reset()
+        # Temp file + os.replace, so a concurrent reader never sees a torn index
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(json.dumps(index, indent=2))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            LOGGER.warning(f"Failed to save cache index: {e}")
+            tmp.unlink(missing_ok=True)
+        return index
+
+
 class CacheManager:
     """Manages local cache for scraped content.
 
@@ -42,17 +165,44 @@ class CacheManager:
         |-- index.json         # URL -> cache entry mapping
         |-- pages/
             |-- a1b2c3d4.json  # Cached response (hash of URL)
+
+    :meth:`set` also stamps each page file's mtime with the entry's expiry, so
+    :meth:`stats` and :meth:`prune_expired` read expiry from the directory scan
+    without opening files. The expiry inside the entry stays authoritative for
+    :meth:`get`.
     """
 
     DEFAULT_CACHE_DIR = Path.home() / ".supacrawl" / "cache"
 
-    def __init__(self, cache_dir: Path | None = None):
+    def __init__(self, cache_dir: Path | None = None, entry_format: CacheFormat = "json"):
         """Initialise cache manager.
 
         Args:
             cache_dir: Cache directory. Defaults to ~/.supacrawl/cache/
                       or SUPACRAWL_CACHE_DIR env var.
+            entry_format: Encoding for newly written entries, ``"json"`` (default)
+                or ``"msgpack"``. Entries in either encoding are always readable.
+
+        Raises:
+            ValidationError: If entry_format is not a supported encoding.
+            ImportError: If entry_format is ``"msgpack"`` and ormsgpack is not installed.
         """
+        if entry_format not in ("json", "msgpack"):
+            raise ValidationError(
+                f"Unsupported cache entry format: {entry_format!r}",
+                field="entry_format",
+                value=entry_format,
+                context={"supported": ["json", "msgpack"]},
+            )
+        if entry_format == "msgpack":
+            try:
+                import ormsgpack  # noqa: F401
+            except ImportError as e:
+                raise ImportError(
+                    "The msgpack cache format requires ormsgpack. Install with: pip install supacrawl[msgpack]"
+                ) from e
+        self.entry_format: CacheFormat = entry_format
+
         if cache_dir:
             self.cache_dir = cache_dir
         else:
@@ -61,17 +211,39 @@ class CacheManager:
 
         self.pages_dir = self.cache_dir / "pages"
         self.index_path = self.cache_dir / "index.json"
+        # Per-entry paths are joined as plain strings (see _page_path)
+        self._pages_str = str(self.pages_dir)
 
         # Ensure directories exist
         self.pages_dir.mkdir(parents=True, exist_ok=True)
 
+        # In-memory mirror of index.json, loaded lazily on first use; mutations
+        # are journalled and merged into the file in batches
+        self._index: dict[str, str] | None = None
+        self._journal = _IndexJournal(self.index_path)
+        # Flushes on close(), on garbage collection, or at interpreter exit,
+        # whichever comes first, without pinning the manager until exit
+        self._finalizer = weakref.finalize(self, self._journal.flush)
+
+    def close(self) -> None:
+        """Write any unsaved index mutations to disk.
+
+        Safe to call more than once. The manager stays usable afterwards; later
+        mutations are flushed again when it is closed or collected.
+        """
+        self._flush_index()
+
     def _cache_key(self, url: str, variant: str | None = None) -> str:
         """Generate cache key from URL and optional variant.
 
-        Uses SHA256 hash of normalised URL (plus variant suffix) for the
-        filename.  URL normalisation removes tracking parameters and fragments.
-        The *variant* differentiates cache entries for the same URL when
-        request parameters affect the output (e.g. screenshot settings).
+        Uses SHA256 hash of the composite ``"<normalised URL>||<variant>"``
+        for the filename.  URL normalisation removes tracking parameters and
+        fragments.  The *variant* differentiates cache entries for the same
+        URL when request parameters affect the output (e.g. screenshot
+        settings).  The ``||`` delimiter is always present, even without a
+        variant, so a URL that itself ends in ``|...`` cannot hash to the
+        same key as a shorter URL plus a variant (variants join their own
+        parts with a single ``|``).
 
         Args:
             url: URL to generate key for.
@@ -81,10 +253,16 @@ class CacheManager:
         Returns:
             16-character hex hash for cache filename.
         """
-        normalised = self._normalise_url(url)
-        if variant:
-            normalised = f"{normalised}|{variant}"
-        return hashlib.sha256(normalised.encode()).hexdigest()[:16]
+        composite = f"{self._normalise_url(url)}||{variant or ''}"
+        return hashlib.sha256(composite.encode()).hexdigest()[:16]
+
+    def _page_path(self, cache_key: str) -> str:
+        """Return the page file path for a cache key.
+
+        A plain string join rather than ``Path`` division: this runs on every
+        get/set, and ``os.path.join`` avoids building intermediate path objects.
+        """
+        return os.path.join(self._pages_str, f"{cache_key}.json")
 
     def _normalise_url(self, url: str) -> str:
         """Normalise URL for cache key generation.
@@ -135,30 +313,40 @@ class CacheManager:
         return urlunparse(parsed)
 
     def _load_index(self) -> dict[str, str]:
-        """Load cache index from disk.
+        """Load cache index, reading it from disk only on first access.
 
         Returns:
-            Dict mapping URL to cache key.
+            Dict mapping URL to cache key. Mutate it only through
+            :meth:`_set_index_entry` so changes are journalled to disk.
         """
-        if not self.index_path.exists():
-            return {}
+        if self._index is None:
+            self._index = _read_index(self.index_path)
+        return self._index
 
-        try:
-            return json.loads(self.index_path.read_text())
-        except (json.JSONDecodeError, OSError) as e:
-            LOGGER.warning(f"Failed to load cache index: {e}")
-            return {}
+    def _set_index_entry(self, normalised_url: str, cache_key: str | None) -> None:
+        """Map a URL to its cache key (or drop it when None), writing back in batches."""
+        index = self._load_index()
+        if cache_key is None:
+            index.pop(normalised_url, None)
+        else:
+            index[normalised_url] = cache_key
+        self._journal.record(normalised_url, cache_key)
+        if self._journal.pending >= _INDEX_FLUSH_EVERY:
+            self._flush_index()
 
-    def _save_index(self, index: dict[str, str]) -> None:
-        """Save cache index to disk.
+    def _flush_index(self) -> None:
+        """Merge unsaved index mutations into index.json, then mirror the result."""
+        merged = self._journal.flush()
+        if merged is not None:
+            self._index = merged
 
-        Args:
-            index: Dict mapping URL to cache key.
-        """
-        try:
-            self.index_path.write_text(json.dumps(index, indent=2))
-        except OSError as e:
-            LOGGER.warning(f"Failed to save cache index: {e}")
+    def _encode_entry(self, entry: CacheEntry) -> bytes:
+        """Encode an entry in this manager's configured format."""
+        if self.entry_format == "msgpack":
+            import ormsgpack
+
+            return ormsgpack.packb(entry.model_dump())
+        return entry.model_dump_json(indent=2).encode()
 
     def get(self, url: str, max_age: int, variant: str | None = None) -> dict[str, Any] | None:
         """Get cached result if fresh enough.
@@ -175,27 +363,24 @@ class CacheManager:
         if max_age <= 0:
             return None
 
-        cache_key = self._cache_key(url, variant=variant)
-        cache_file = self.pages_dir / f"{cache_key}.json"
-
-        if not cache_file.exists():
-            LOGGER.debug(f"Cache miss (not found): {url}")
-            return None
+        cache_file = self._page_path(self._cache_key(url, variant=variant))
 
         try:
-            entry = CacheEntry.model_validate_json(cache_file.read_text())
+            # Open directly rather than exists() first: a miss costs one syscall
+            with open(cache_file, "rb") as fh:
+                entry = _decode_entry(fh.read())
 
             # Check if expired
-            expires_at = datetime.fromisoformat(entry.expires_at)
-            now = datetime.now(timezone.utc)
-
-            if now > expires_at:
+            if _is_expired(entry, time.time()):
                 LOGGER.debug(f"Cache miss (expired): {url}")
                 return None
 
             LOGGER.debug(f"Cache hit: {url}")
             return entry.response
 
+        except FileNotFoundError:
+            LOGGER.debug(f"Cache miss (not found): {url}")
+            return None
         except Exception as e:
             LOGGER.warning(f"Failed to read cache entry for {url}: {e}")
             return None
@@ -213,14 +398,11 @@ class CacheManager:
         Returns:
             CacheEntry if found, None if no cached entry exists.
         """
-        cache_key = self._cache_key(url, variant=variant)
-        cache_file = self.pages_dir / f"{cache_key}.json"
-
-        if not cache_file.exists():
-            return None
-
         try:
-            return CacheEntry.model_validate_json(cache_file.read_text())
+            with open(self._page_path(self._cache_key(url, variant=variant)), "rb") as fh:
+                return _decode_entry(fh.read())
+        except FileNotFoundError:
+            return None
         except Exception as e:
             LOGGER.warning(f"Failed to read cache entry for {url}: {e}")
             return None
@@ -247,29 +429,31 @@ class CacheManager:
             return
 
         cache_key = self._cache_key(url, variant=variant)
-        cache_file = self.pages_dir / f"{cache_key}.json"
+        cache_file = self._page_path(cache_key)
 
-        now = datetime.now(timezone.utc)
-        expires_at = datetime.fromtimestamp(now.timestamp() + max_age, tz=timezone.utc)
+        now = time.time()
+        expires_epoch = int(now) + max_age
+        expires_at = datetime.fromtimestamp(expires_epoch, tz=timezone.utc).isoformat()
 
         entry = CacheEntry(
             url=url,
-            cached_at=now.isoformat(),
-            expires_at=expires_at.isoformat(),
+            cached_at=datetime.fromtimestamp(now, tz=timezone.utc).isoformat(),
+            expires_at=expires_at,
+            expires_epoch=expires_epoch,
             content_hash=content_hash,
             response=response,
         )
+        payload = self._encode_entry(entry)
 
         try:
-            cache_file.write_text(entry.model_dump_json(indent=2))
+            with open(cache_file, "wb") as fh:
+                fh.write(payload)
+            os.utime(cache_file, (expires_epoch, expires_epoch))
 
             # Update index
-            index = self._load_index()
-            normalised_url = self._normalise_url(url)
-            index[normalised_url] = cache_key
-            self._save_index(index)
+            self._set_index_entry(self._normalise_url(url), cache_key)
 
-            LOGGER.debug(f"Cached: {url} (expires: {expires_at.isoformat()})")
+            LOGGER.debug(f"Cached: {url} (expires: {expires_at})")
 
         except OSError as e:
             LOGGER.warning(f"Failed to cache {url}: {e}")
@@ -287,57 +471,110 @@ class CacheManager:
 
         if url:
             # Clear specific URL
-            cache_key = self._cache_key(url)
-            cache_file = self.pages_dir / f"{cache_key}.json"
-
-            if cache_file.exists():
-                cache_file.unlink()
+            try:
+                os.unlink(self._page_path(self._cache_key(url)))
                 cleared = 1
                 LOGGER.debug(f"Cleared cache for: {url}")
+            except FileNotFoundError:
+                pass
 
             # Update index
-            index = self._load_index()
             normalised_url = self._normalise_url(url)
-            if normalised_url in index:
-                del index[normalised_url]
-                self._save_index(index)
+            if normalised_url in self._load_index():
+                self._set_index_entry(normalised_url, None)
+                self._flush_index()
         else:
             # Clear all cache
-            for cache_file in self.pages_dir.glob("*.json"):
-                cache_file.unlink()
+            for page in self._scan_pages():
+                os.unlink(page.path)
                 cleared += 1
 
             # Clear index
-            if self.index_path.exists():
-                self.index_path.unlink()
+            self._index = {}
+            self._journal.reset()
+            self.index_path.unlink(missing_ok=True)
 
             LOGGER.debug(f"Cleared all cache ({cleared} entries)")
 
         return cleared
 
+    def _scan_pages(self) -> list[os.DirEntry[str]]:
+        """List cached page files with a single directory read.
+
+        ``os.scandir`` returns each entry's file type (and, on most platforms,
+        its size) from the directory read itself, so callers avoid a separate
+        ``stat`` syscall per file.
+
+        Returns:
+            Directory entries for every ``*.json`` file under ``pages/``.
+        """
+        with os.scandir(self._pages_str) as it:
+            return [entry for entry in it if entry.name.endswith(".json") and entry.is_file()]
+
+    @staticmethod
+    def _stamped_expiry(st: os.stat_result) -> float | None:
+        """Return the expiry :meth:`set` stamped into a page file's mtime.
+
+        The stamp is always later than the write itself, so a stamped file has
+        mtime > ctime (utime moves ctime to the moment of stamping). Files
+        written any other way (legacy entries, hand-written fixtures, plain
+        copies) have mtime <= ctime and return None: their expiry must be read
+        from the entry.
+        """
+        return st.st_mtime if st.st_mtime > st.st_ctime else None
+
+    @staticmethod
+    def _read_entry(path: str) -> CacheEntry | None:
+        """Read and validate one cache file, returning None if unreadable."""
+        try:
+            with open(path, "rb") as fh:
+                return _decode_entry(fh.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            LOGGER.debug(f"Failed to read cache file {path}: {e}")
+            return None
+
+    def _read_entries(self, files: list[os.DirEntry[str]]) -> list[CacheEntry | None]:
+        """Read cache files concurrently, preserving input order.
+
+        Args:
+            files: Directory entries from :meth:`_scan_pages`.
+
+        Returns:
+            One parsed entry (or None when unreadable) per input file.
+        """
+        if not files:
+            return []
+        with ThreadPoolExecutor(max_workers=min(_SCAN_WORKERS, len(files))) as pool:
+            return list(pool.map(self._read_entry, [f.path for f in files]))
+
     def stats(self) -> dict[str, Any]:
         """Get cache statistics.
 
         Returns:
             Dict with cache stats (entries, size, etc.)
         """
-        entries = 0
+        now = time.time()
+        files = self._scan_pages()
         total_size = 0
         expired = 0
-        now = datetime.now(timezone.utc)
-
-        for cache_file in self.pages_dir.glob("*.json"):
-            entries += 1
-            total_size += cache_file.stat().st_size
-
-            try:
-                entry = CacheEntry.model_validate_json(cache_file.read_text())
-                expires_at = datetime.fromisoformat(entry.expires_at)
-                if now > expires_at:
-                    expired += 1
-            except Exception:
-                pass
-
+        unstamped: list[os.DirEntry[str]] = []
+
+        for page in files:
+            st = page.stat()
+            total_size += st.st_size
+            expiry = self._stamped_expiry(st)
+            if expiry is None:
+                unstamped.append(page)
+            elif now > expiry:
+                expired += 1
+
+        for entry in self._read_entries(unstamped):
+            if entry is not None and _is_expired(entry, now):
+                expired += 1
+
+        entries = len(files)
         return {
             "entries": entries,
             "expired": expired,
@@ -350,44 +587,56 @@ class CacheManager:
     @staticmethod
     def _format_size(size_bytes: int) -> str:
         """Format size in human-readable format."""
-        size: float = float(size_bytes)
-        for unit in ["B", "KB", "MB", "GB"]:
-            if size < 1024:
-                return f"{size:.1f} {unit}"
-            size /= 1024
-        return f"{size:.1f} TB"
+        # bit_length picks the power of 1024 directly (10 bits per unit)
+        unit = min(max(0, (size_bytes.bit_length() - 1) // 10), len(_SIZE_UNITS) - 1)
+        return f"{size_bytes / (1 << (unit * 10)):.1f} {_SIZE_UNITS[unit]}"
 
     def prune_expired(self) -> int:
         """Remove expired cache entries.
 
+        Stamped page files are judged from the directory scan alone; only
+        unstamped ones (see :meth:`_stamped_expiry`) are opened and parsed.
+
         Returns:
             Number of entries pruned.
         """
         pruned = 0
-        now = datetime.now(timezone.utc)
+        now = time.time()
         index = self._load_index()
+        urls_by_key = {key: url for url, key in index.items()}
         modified = False
 
-        for cache_file in self.pages_dir.glob("*.json"):
+        expired: list[os.DirEntry[str]] = []
+        unstamped: list[os.DirEntry[str]] = []
+        for page in self._scan_pages():
+            expiry = self._stamped_expiry(page.stat())
+            if expiry is None:
+                unstamped.append(page)
+            elif now > expiry:
+                expired.append(page)
+
+        for page, entry in zip(unstamped, self._read_entries(unstamped), strict=True):
+            if entry is None:
+                LOGGER.warning(f"Error checking cache file {page.path}: unreadable entry")
+            elif _is_expired(entry, now):
+                expired.append(page)
+
+        for page in expired:
             try:
-                entry = CacheEntry.model_validate_json(cache_file.read_text())
-                expires_at = datetime.fromisoformat(entry.expires_at)
-
-                if now > expires_at:
-                    cache_file.unlink()
-                    pruned += 1
-
-                    # Remove from index
-                    normalised_url = self._normalise_url(entry.url)
-                    if normalised_url in index:
-                        del index[normalised_url]
-                        modified = True
-
-            except Exception as e:
-                LOGGER.warning(f"Error checking cache file {cache_file}: {e}")
+                os.unlink(page.path)
+            except OSError as e:
+                LOGGER.warning(f"Error removing cache file {page.path}: {e}")
+                continue
+            pruned += 1
+
+            # Remove from index
+            normalised_url = urls_by_key.get(page.name.removesuffix(".json"))
+            if normalised_url is not None:
+                self._set_index_entry(normalised_url, None)
+                modified = True
 
         if modified:
-            self._save_index(index)
+            self._flush_index()
 
         LOGGER.debug(f"Pruned {pruned} expired entries")
         return pruned
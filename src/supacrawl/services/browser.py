@@ -500,6 +500,7 @@ class BrowserManager:
         proxy: str | None = None,
         engine: str | None = None,
         firefox_user_prefs: dict[str, Any] | None = None,
+        cdp_url: str | None = None,
     ):
         """Initialize browser manager.
 
@@ -524,6 +525,11 @@ class BrowserManager:
             firefox_user_prefs: Firefox about:config preferences for Camoufox.
                 Only used when engine="camoufox". Example:
                 {"network.http.http2.enabled": False} to force HTTP/1.1.
+            cdp_url: Chrome DevTools Protocol endpoint of an already-running Chromium
+                (e.g. http://localhost:9222). When set, start() connects to it instead
+                of launching a browser, so many managers can share one process; the
+                launch-only settings (headless, proxy) are then the remote's own.
+                Not supported with engine="camoufox".
         """
         # Resolve engine from explicit engine param, stealth flag, or default
         if engine is not None:
@@ -535,6 +541,10 @@ class BrowserManager:
         else:
             self.engine = "playwright"
 
+        if cdp_url and self.engine == "camoufox":
+            raise ValueError("cdp_url requires a Chromium engine; camoufox cannot connect over CDP")
+        self.cdp_url = cdp_url
+
         # Keep stealth flag for backwards compat (True when engine is patchright or camoufox)
         self.stealth = self.engine in ("patchright", "camoufox")
 
@@ -765,6 +775,12 @@ class BrowserManager:
         async_playwright = self._get_playwright_module()
         self._playwright = await async_playwright().start()
 
+        if self.cdp_url:
+            # Closing a connected browser only disconnects; the remote keeps running
+            self._browser = await self._playwright.chromium.connect_over_cdp(self.cdp_url)
+            LOGGER.debug("Browser connected over CDP (engine=%s, endpoint=%s)", self.engine, self.cdp_url)
+            return
+
         # Build launch options
         launch_options: dict[str, Any] = {"headless": self.headless}
 
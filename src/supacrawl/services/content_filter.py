@@ -28,6 +28,8 @@ import logging
 
 from bs4 import BeautifulSoup, Tag
 
+from supacrawl.services.converter import make_soup
+
 LOGGER = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -65,6 +67,15 @@ _BM25_DROP_THRESHOLD_BASE = 0.20
 # Heading/sectioning tags used to split content into BM25 sections.
 _SECTION_SPLIT_TAGS = frozenset({"h2", "h3", "section", "article"})
 
+# Empty document whose only job is minting detached <div> wrappers via new_tag(),
+# instead of parsing "<div></div>" into a fresh soup for every section
+_WRAPPER_FACTORY = BeautifulSoup("", "html.parser")
+
+
+def _new_wrapper() -> Tag:
+    """Return a detached, empty <div> to collect copied nodes in."""
+    return _WRAPPER_FACTORY.new_tag("div")
+
 
 # ---------------------------------------------------------------------------
 # Availability guards (mirrors _is_patchright_available in scrape.py)
@@ -167,9 +178,7 @@ def _split_into_sections(root: Tag) -> list[Tag]:
     def flush() -> None:
         if not current_parts:
             return
-        wrapper = BeautifulSoup("<div></div>", "html.parser").find("div")
-        if not isinstance(wrapper, Tag):
-            raise TypeError("BeautifulSoup failed to produce a div wrapper")
+        wrapper = _new_wrapper()
         for part in current_parts:
             wrapper.append(part.__copy__())
         sections.append(wrapper)
@@ -186,9 +195,7 @@ def _split_into_sections(root: Tag) -> list[Tag]:
 
     if not sections:
         # No split tags found — treat whole root as one section.
-        wrapper = BeautifulSoup("<div></div>", "html.parser").find("div")
-        if not isinstance(wrapper, Tag):
-            raise TypeError("BeautifulSoup failed to produce a div wrapper")
+        wrapper = _new_wrapper()
         wrapper.append(root.__copy__())
         sections = [wrapper]
 
@@ -366,7 +373,7 @@ def _strategy2(html: str, content_mode: float) -> Tag | None:
         if not summary_html:
             return None
 
-        summary_soup = BeautifulSoup(summary_html, "html.parser")
+        summary_soup = make_soup(summary_html)
         body = summary_soup.find("body")
         root = body if isinstance(body, Tag) else summary_soup
 
@@ -412,11 +419,9 @@ def _strategy3_body_fallback(soup: BeautifulSoup, content_mode: float) -> Tag:
         return root
 
     # Rebuild a synthetic body from kept sections
-    new_body = BeautifulSoup("<div></div>", "html.parser").find("div")
-    if not isinstance(new_body, Tag):
-        raise TypeError("BeautifulSoup failed to produce a div wrapper")
+    new_body = _new_wrapper()
     for sec in kept:
-        for child in list(sec.children):
+        for child in sec.contents:
             new_body.append(child.__copy__())
 
     LOGGER.debug("Strategy 3 body-prune: kept %d/%d sections", len(kept), len(sections))
@@ -456,11 +461,9 @@ def _apply_query_filter(root: Tag, content_mode: float, query: str) -> Tag:
     if len(kept) == len(sections):
         return root
 
-    new_root = BeautifulSoup("<div></div>", "html.parser").find("div")
-    if not isinstance(new_root, Tag):
-        raise TypeError("BeautifulSoup failed to produce a div wrapper")
+    new_root = _new_wrapper()
     for sec in kept:
-        for child in list(sec.children):
+        for child in sec.contents:
             new_root.append(child.__copy__())
 
     LOGGER.debug(
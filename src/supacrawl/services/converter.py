@@ -14,29 +14,177 @@ Some documentation frameworks produce HTML that converts poorly to markdown.
 We maintain a registry of site-specific preprocessors that improve output quality.
 
 To add a new preprocessor:
-1. Create a detection function: _detect_<name>(soup) -> bool
-2. Create a handler function: _preprocess_<name>(soup) -> None
+1. Create a detection function: _detect_<name>(soup, index=None) -> bool
+2. Create a handler function: _preprocess_<name>(soup, index=None) -> None
 3. Register in SITE_PREPROCESSORS with documentation
 
+Both receive a NodeIndex built in a single traversal of the current tree; look
+nodes up through it rather than running another select() over the document.
+
 See SITE_PREPROCESSORS below for the current registry.
 """
 
+import hashlib
 import logging
+import re
+import sys
+from collections import OrderedDict, defaultdict
 from collections.abc import Callable
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from typing import Any
 from urllib.parse import urljoin, urlparse
 
-from bs4 import BeautifulSoup, Tag
+import soupsieve
+from bs4 import BeautifulSoup, FeatureNotFound, Tag
 from markdownify import MarkdownConverter as BaseMarkdownConverter
 
 LOGGER = logging.getLogger(__name__)
 
 
+# Converted pages remembered per MarkdownConverter instance. Each slot retains a full
+# markdown output; only byte-identical HTML converted with identical options hits.
+_CONVERT_CACHE_SIZE = 1024
+
+# markdownify options shared by every MarkdownConverter
+_MARKDOWNIFY_OPTIONS: dict[str, Any] = {
+    "heading_style": "atx",
+    "bullets": "-",
+    "code_language": "",
+    # Tested with `in` for every tag markdownify converts
+    "strip": frozenset({"script", "style", "nav", "footer", "header"}),
+    "wrap": False,
+    "wrap_width": 0,
+}
+
+# Script pseudo-protocol hrefs (javascript:, vbscript:), matched the way browsers
+# resolve them: case-insensitive, after any leading whitespace or NUL bytes
+_SCRIPT_PROTOCOL_RE = re.compile(r"^[\s\0]*(?:javascript|vbscript):", re.IGNORECASE)
+
+
+# Two or more blank lines
+_BLANK_RUNS_RE = re.compile(r"\n{3,}")
+
+# Selector features whose match depends on later siblings or descendants, which the
+# fused exclude/include walk has not yet pruned when it tests an element
+_LOOKAHEAD_SELECTOR_RE = re.compile(
+    r":(?:has|empty|last|only|nth-last|-soup-contains|contains|default|indeterminate|dir)", re.IGNORECASE
+)
+# Selector features that depend on earlier siblings. Harmless for include_tags, but an
+# exclude_tags selector like p:first-child would cascade onto each newly-first sibling
+_SIBLING_SELECTOR_RE = re.compile(r"[+~]|:(?:first|nth)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def _compile_selector(selector: str) -> tuple[Any | None, str | None]:
+    """Compile a user-supplied CSS selector, caching failures as well as successes.
+
+    include_tags/exclude_tags are usually the same few selectors on every page of
+    a crawl, so an invalid one is parsed (and its error built) only once.
+
+    Returns:
+        (compiled selector, None), or (None, error message) if the selector is invalid
+    """
+    try:
+        return soupsieve.compile(selector), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _resolve_parser() -> str:
+    """Pick the fastest available BeautifulSoup tree builder.
+
+    lxml builds the tree in C and is several times faster than the pure-Python
+    html.parser on real pages. Fall back to html.parser when lxml is missing so
+    a broken wheel never takes conversion down with it.
+    """
+    try:
+        BeautifulSoup("", "lxml")
+    except FeatureNotFound:
+        LOGGER.debug("lxml not available, falling back to html.parser")
+        return "html.parser"
+    return "lxml"
+
+
+# Tree builder used for every soup this module parses
+HTML_PARSER = _resolve_parser()
+
+
+def make_soup(html: str) -> BeautifulSoup:
+    """Parse HTML with the converter's preferred tree builder.
+
+    Args:
+        html: Raw HTML to parse
+
+    Returns:
+        Parsed BeautifulSoup document
+    """
+    return BeautifulSoup(html, HTML_PARSER)
+
+
 # =============================================================================
 # Site-Specific Preprocessor Registry
 # =============================================================================
 
 
+# Class and attribute names the detectors and preprocessors look up. Interned, like
+# NodeIndex's keys, so dict lookups settle on an identity check instead of comparing
+# characters; most are not identifier-like, so Python would not intern them itself.
+_MD_CONTENT = sys.intern("md-content")
+_MD_MAIN = sys.intern("md-main")
+_MD_COMPONENT_ATTR = sys.intern("data-md-component")
+_HEADERLINK = sys.intern("headerlink")
+_ADMONITION = sys.intern("admonition")
+_TABBED_SET = sys.intern("tabbed-set")
+_HIGHLIGHTTABLE = sys.intern("highlighttable")
+_LIST_LEVEL_ATTR = sys.intern("data-list-level")
+
+
+class NodeIndex:
+    """Tag, class and attribute lookups for a soup, built in one traversal.
+
+    Every detector and preprocessor used to run its own select() over the whole
+    document. The index walks the tree once and turns those scans into dict
+    lookups. Lists keep document order, matching select().
+
+    The index is a snapshot: rebuild it after mutating the tree.
+
+    Attributes:
+        by_tag: Elements keyed by tag name
+        by_class: Elements keyed by each of their class names
+        by_attr: Elements keyed by each of their attribute names (except class)
+    """
+
+    def __init__(self, soup: BeautifulSoup):
+        """Index every element under soup."""
+        self.by_tag: dict[str, list[Tag]] = defaultdict(list)
+        self.by_class: dict[str, list[Tag]] = defaultdict(list)
+        self.by_attr: dict[str, list[Tag]] = defaultdict(list)
+
+        for el in soup.descendants:
+            if not isinstance(el, Tag):
+                continue
+            self.by_tag[el.name].append(el)
+            for attr, value in el.attrs.items():
+                if attr == "class":
+                    for cls in value.split() if isinstance(value, str) else value:
+                        self.by_class[sys.intern(cls)].append(el)
+                else:
+                    self.by_attr[sys.intern(attr)].append(el)
+
+    def with_class(self, cls: str, name: str | None = None) -> list[Tag]:
+        """Elements carrying a class, optionally restricted to one tag name."""
+        return [el for el in self.by_class.get(cls, ()) if name is None or el.name == name]
+
+    def with_attr(self, attr: str, name: str | None = None) -> list[Tag]:
+        """Elements carrying an attribute, optionally restricted to one tag name."""
+        return [el for el in self.by_attr.get(attr, ()) if name is None or el.name == name]
+
+    def with_class_containing(self, fragment: str) -> list[Tag]:
+        """Elements with a class name containing fragment, like [class*='...']."""
+        return [el for cls, els in self.by_class.items() if fragment in cls for el in els]
+
+
 @dataclass
 class SitePreprocessor:
     """Registration for a site-specific HTML preprocessor.
@@ -47,16 +195,43 @@ class SitePreprocessor:
         examples: Example sites using this framework
         detect: Function to check if this preprocessor applies
         preprocess: Function to transform the HTML
+        markers: Substrings, at least one of which appears in the raw HTML of any
+            page detect() can accept. Lets pages with none of them skip detection
+            without walking the tree. Leave empty if no such substring exists.
     """
 
     name: str
     description: str
     examples: list[str]
-    detect: Callable[[BeautifulSoup], bool]
-    preprocess: Callable[[BeautifulSoup], None]
+    detect: Callable[[BeautifulSoup, NodeIndex | None], bool]
+    preprocess: Callable[[BeautifulSoup, NodeIndex | None], None]
+    markers: tuple[str, ...] = ()
+
+    @cached_property
+    def marker_pattern(self) -> re.Pattern[str] | None:
+        """The markers compiled into one case-insensitive pattern, or None without markers."""
+        if not self.markers:
+            return None
+        return re.compile("|".join(map(re.escape, self.markers)), re.IGNORECASE)
+
+    def could_match(self, html: str) -> bool:
+        """Check whether raw HTML contains any marker, so detect() is worth running.
 
+        Always True for a preprocessor that declares no markers.
+        """
+        return self.marker_pattern is None or self.marker_pattern.search(html) is not None
+
+
+# (class, tag) pairs that each hint at MkDocs; two together are taken as a match
+_MKDOCS_INDICATORS = (
+    (_HEADERLINK, "a"),
+    (_ADMONITION, "div"),
+    (_TABBED_SET, "div"),
+    (_HIGHLIGHTTABLE, "table"),
+)
 
-def _detect_mkdocs_material(soup: BeautifulSoup) -> bool:
+
+def _detect_mkdocs_material(soup: BeautifulSoup, index: NodeIndex | None = None) -> bool:
     """Detect if the page is built with MkDocs Material theme.
 
     Checks for characteristic MkDocs Material markers:
@@ -64,86 +239,94 @@ def _detect_mkdocs_material(soup: BeautifulSoup) -> bool:
     - data-md-* attributes (Material Design data attributes)
     - Combination of admonition + headerlink classes
     """
+    if index is None:
+        index = NodeIndex(soup)
+
     # Check for MkDocs Material specific classes
-    if soup.select_one(".md-content, .md-main, [data-md-component]"):
+    if index.by_class.get(_MD_CONTENT) or index.by_class.get(_MD_MAIN) or index.by_attr.get(_MD_COMPONENT_ATTR):
         return True
 
-    # Check for combination of MkDocs-specific elements
-    has_headerlinks = bool(soup.select_one("a.headerlink"))
-    has_admonitions = bool(soup.select_one("div.admonition"))
-    has_tabbed = bool(soup.select_one("div.tabbed-set"))
-    has_highlighttable = bool(soup.select_one("table.highlighttable"))
+    # If we see multiple MkDocs patterns, it's likely MkDocs; stop at the second
+    mkdocs_indicators = 0
+    for cls, name in _MKDOCS_INDICATORS:
+        if any(el.name == name for el in index.by_class.get(cls, ())):
+            mkdocs_indicators += 1
+            if mkdocs_indicators >= 2:
+                return True
+    return False
+
 
-    # If we see multiple MkDocs patterns, it's likely MkDocs
-    mkdocs_indicators = sum([has_headerlinks, has_admonitions, has_tabbed, has_highlighttable])
-    return mkdocs_indicators >= 2
+# Maximum element-sibling distance between two counter-list items in the same list
+_LIST_PROXIMITY = 10
 
 
-def _detect_css_counter_lists(soup: BeautifulSoup) -> bool:
+def _detect_css_counter_lists(soup: BeautifulSoup, index: NodeIndex | None = None) -> bool:
     """Detect if the page uses CSS counter-based lists.
 
     Checks for <p> elements with data-list-level attributes, which are used
     by some documentation sites instead of native <ol>/<li> elements.
     """
-    return bool(soup.select("p[data-list-level]"))
+    if index is None:
+        index = NodeIndex(soup)
+    return bool(index.with_attr(_LIST_LEVEL_ATTR, "p"))
 
 
-def _preprocess_css_counter_lists(soup: BeautifulSoup) -> None:
+def _preprocess_css_counter_lists(soup: BeautifulSoup, index: NodeIndex | None = None) -> None:
     """Preprocess CSS counter-based lists for better markdown conversion.
 
     Converts <p> elements with data-list-level attributes to proper <ol>/<li> elements.
     Handles nested hierarchies based on level values.
 
+    The items are collected with a single lookup, grouped with one flat sweep over
+    precomputed sibling positions, and each group is rebuilt with a level stack;
+    the document itself is only touched when a finished list is swapped in.
+
     Args:
         soup: BeautifulSoup object to modify in-place
+        index: NodeIndex of soup's current tree (built if omitted)
     """
-    list_items = soup.select("p[data-list-level]")
+    if index is None:
+        index = NodeIndex(soup)
+    list_items = index.with_attr(_LIST_LEVEL_ATTR, "p")
     if not list_items:
         return
 
-    # Process consecutive groups of list items
-    i = 0
-    while i < len(list_items):
-        # Find consecutive items (allowing for some non-list elements in between)
-        group = [list_items[i]]
-        current = list_items[i]
-
-        for j in range(i + 1, len(list_items)):
-            next_item = list_items[j]
-            # Check if next_item follows current within a reasonable distance
-            if _is_within_proximity(current, next_item, max_distance=10):
-                group.append(next_item)
-                current = next_item
-            else:
-                break
-
-        # Convert this group to nested lists
-        if group:
-            _build_nested_list(soup, group)
-            i += len(group)
+    # Position of each item among its parent's element children, so proximity is an
+    # integer comparison instead of a find_next_sibling walk
+    positions: dict[int, tuple[int, int]] = {}
+    for parent in {id(item.parent): item.parent for item in list_items}.values():
+        if parent is None:
+            continue
+        position = 0
+        for child in parent.contents:
+            if isinstance(child, Tag):
+                positions[id(child)] = (id(parent), position)
+                position += 1
+
+    # Consecutive items within _LIST_PROXIMITY element siblings form one list
+    group = [list_items[0]]
+    for item in list_items[1:]:
+        prev = positions.get(id(group[-1]))
+        curr = positions.get(id(item))
+        if prev is not None and curr is not None and prev[0] == curr[0] and 0 < curr[1] - prev[1] <= _LIST_PROXIMITY:
+            group.append(item)
         else:
-            i += 1
-
+            _build_nested_list(soup, group)
+            group = [item]
+    _build_nested_list(soup, group)
 
-def _is_within_proximity(elem1, elem2, max_distance: int = 10) -> bool:
-    """Check if two elements are within proximity in the DOM.
 
-    Args:
-        elem1: First element
-        elem2: Second element
-        max_distance: Maximum number of siblings to check
+@lru_cache(maxsize=64)
+def _parse_list_level(value: str) -> int | None:
+    """Parse a data-list-level value, or None if it is not an integer.
 
-    Returns:
-        True if elem2 is within max_distance siblings of elem1
+    Pages repeat a handful of level strings, so results are memoised; that also
+    spares the exception on every repeat of an invalid value.
     """
-    current = elem1
-    for _ in range(max_distance):
-        current = current.find_next_sibling()
-        if current is None:
-            return False
-        if current == elem2:
-            return True
-    return False
+    try:
+        return int(value)
+    except ValueError:
+        return None
 
 
 def _get_list_level(item: Tag, default: int = 1) -> int:
@@ -156,11 +339,50 @@ def _get_list_level(item: Tag, default: int = 1) -> int:
     Returns:
         Integer level value, or default if invalid
     """
-    try:
-        level_str = str(item.get("data-list-level") or str(default))
-        return int(level_str)
-    except ValueError, TypeError:
+    value = item.get(_LIST_LEVEL_ATTR)
+    if not value:
         return default
+    level = _parse_list_level(str(value))
+    return default if level is None else level
+
+
+def _nest_levels(levels: list[int]) -> tuple[list[int], list[tuple[int, int]]]:
+    """Work out the list nesting for a run of counter-list levels.
+
+    Pure integer pass with a stack of open lists, kept apart from the DOM so the
+    tree is only touched once the structure is known. List 0 is the root list,
+    at the run's minimum level so every item has an ancestor.
+
+    Args:
+        levels: data-list-level of each item, in document order
+
+    Returns:
+        Tuple of (list_of, parents). list_of[i] is the id of the list item i goes
+        in. parents[k] is (enclosing list id, index of the item whose <li> holds
+        list k, or -1 to attach it to the enclosing list directly); parents[0]
+        is (-1, -1). List ids are allocated in document order.
+    """
+    list_of: list[int] = []
+    parents: list[tuple[int, int]] = [(-1, -1)]
+    # Open lists from the root outwards as (level, list id, last item index or -1)
+    stack: list[tuple[int, int, int]] = [(min(levels), 0, -1)]
+
+    for i, level in enumerate(levels):
+        # Close lists nested deeper than this item
+        while stack[-1][0] > level:
+            stack.pop()
+
+        open_level, list_id, last_item = stack[-1]
+        if open_level < level:
+            # Open a nested list under the last item of the enclosing level
+            parents.append((list_id, last_item))
+            list_id = len(parents) - 1
+            stack.append((level, list_id, i))
+        else:
+            stack[-1] = (open_level, list_id, i)
+        list_of.append(list_id)
+
+    return list_of, parents
 
 
 def _build_nested_list(soup: BeautifulSoup, items: list[Tag]) -> None:
@@ -173,72 +395,33 @@ def _build_nested_list(soup: BeautifulSoup, items: list[Tag]) -> None:
     if not items:
         return
 
-    # Track current list at each level
-    lists_by_level: dict[int, Tag] = {}
-    last_li_by_level: dict[int, Tag] = {}
-
-    # Find the root level (minimum level in the group)
-    root_level = min(_get_list_level(item) for item in items)
-
-    # Create root list
-    root_list = soup.new_tag("ol")
-    lists_by_level[root_level] = root_list
-    anchor = items[0]  # We'll replace this element with the root list
-
-    for item in items:
-        level = _get_list_level(item)
-
-        # Get or create the list for this level
-        if level not in lists_by_level:
-            # Need to create a nested list
-            # Find the parent level (highest level less than current)
-            parent_level = max(lvl for lvl in lists_by_level.keys() if lvl < level)
-            parent_li = last_li_by_level.get(parent_level)
+    list_of, parents = _nest_levels([_get_list_level(item) for item in items])
 
-            # Create new nested list
+    lists = [soup.new_tag("ol")]
+    list_items: list[Tag] = []
+    for item, list_id in zip(items, list_of, strict=True):
+        if list_id == len(lists):
+            # First item of a nested list: attach the list where _nest_levels placed it
+            parent_list, host_item = parents[list_id]
             nested_list = soup.new_tag("ol")
-            if parent_li is not None:
-                parent_li.append(nested_list)
-            else:
-                # Fallback: append to parent list
-                lists_by_level[parent_level].append(nested_list)
-
-            lists_by_level[level] = nested_list
-
-            # Clean up deeper levels that are now invalid
-            for lvl in list(lists_by_level.keys()):
-                if lvl > level:
-                    del lists_by_level[lvl]
-                    if lvl in last_li_by_level:
-                        del last_li_by_level[lvl]
-
-        # Create the list item
-        li = soup.new_tag("li")
+            (list_items[host_item] if host_item >= 0 else lists[parent_list]).append(nested_list)
+            lists.append(nested_list)
 
         # Move content from <p> to <li>
-        for child in list(item.children):
-            li.append(child.extract())
-
-        # Append to the appropriate list
-        lists_by_level[level].append(li)
-        last_li_by_level[level] = li
-
-        # Clean up levels deeper than current
-        for lvl in list(lists_by_level.keys()):
-            if lvl > level:
-                del lists_by_level[lvl]
-                if lvl in last_li_by_level:
-                    del last_li_by_level[lvl]
+        li = soup.new_tag("li")
+        li.extend(item)
+        lists[list_id].append(li)
+        list_items.append(li)
 
     # Replace the first item with the complete list structure
-    anchor.replace_with(root_list)
+    items[0].replace_with(lists[0])
 
     # Remove the other items (their content has been moved)
     for item in items[1:]:
         item.decompose()
 
 
-def _detect_wordpress(soup: BeautifulSoup) -> bool:
+def _detect_wordpress(soup: BeautifulSoup, index: NodeIndex | None = None) -> bool:
     """Detect if the page is a WordPress site.
 
     Detection signals:
@@ -248,27 +431,87 @@ def _detect_wordpress(soup: BeautifulSoup) -> bool:
 
     Args:
         soup: BeautifulSoup object to analyze
+        index: NodeIndex of soup's current tree (built if omitted)
 
     Returns:
         True if WordPress site detected, False otherwise
     """
-    # Check for wp- prefixed classes
-    if soup.select("[class*='wp-']"):
+    if index is None:
+        index = NodeIndex(soup)
+
+    # Check for post-related classes (plain lookups, so before any scan)
+    if index.by_class.get("hentry") or index.by_class.get("entry-content"):
+        return True
+
+    # WordPress themes print body_class(), which nearly always carries a wp- or
+    # post- class, so a real WordPress page usually stops here
+    body = index.by_tag.get("body")
+    if body and any("wp-" in cls or "post-" in cls for cls in body[0].get("class") or ()):
         return True
 
-    # Check for post-related classes
-    if soup.select("[class*='post-'], .hentry, .entry-content"):
+    # Check for wp- prefixed and post- classes in one scan of the class names
+    if any("wp-" in cls or "post-" in cls for cls in index.by_class):
         return True
 
     # Check for WordPress meta generator
-    meta_gen = soup.find("meta", attrs={"name": "generator"})
+    meta_gen = next((meta for meta in index.by_tag.get("meta", ()) if meta.get("name") == "generator"), None)
     if meta_gen and "wordpress" in str(meta_gen.get("content") or "").lower():
         return True
 
     return False
 
 
-def _preprocess_wordpress(soup: BeautifulSoup) -> None:
+# Classes whose elements _preprocess_wordpress strips outright
+_WORDPRESS_REMOVE_CLASSES = frozenset(
+    {
+        # Fixed navigation (common in BeTheme and similar themes)
+        "fixed-nav",
+        "fixed-nav-prev",
+        "fixed-nav-next",
+        # Post navigation
+        "post-navigation",
+        "nav-links",
+        "post-pager",
+        # Share widgets
+        "share-simple-wrapper",
+        "sharedaddy",
+        "social-share",
+        # Related posts sections
+        "related-posts",
+        "section-post-related",
+        "yarpp-related",
+        # Rating/feedback forms
+        "rich-reviews",
+        "feedback-form",
+    }
+)
+
+# Class name fragments whose elements _preprocess_wordpress strips, like [class*='...']
+_WORDPRESS_REMOVE_CLASS_FRAGMENTS = ("rating", "review-form")
+
+# src prefix of the inline SVG images lazy-loading plugins put in place of real ones
+_SVG_PLACEHOLDER_PREFIX = "data:image/svg+xml"
+
+
+def _find_wordpress_title(index: NodeIndex) -> Tag | None:
+    """Find the page title H1, trying common WordPress header locations in order.
+
+    Index lookups equivalent to select_one() over "#Subheader h1.title",
+    ".entry-title", ".page-title" and "header h1", in that order of preference.
+    """
+    for h1 in index.with_class("title", "h1"):
+        if any(parent.get("id") == "Subheader" for parent in h1.parents):
+            return h1
+    for cls in ("entry-title", "page-title"):
+        if tagged := index.by_class.get(cls):
+            return tagged[0]
+    for h1 in index.by_tag.get("h1", ()):
+        if h1.find_parent("header") is not None:
+            return h1
+    return None
+
+
+def _preprocess_wordpress(soup: BeautifulSoup, index: NodeIndex | None = None) -> None:
     """Preprocess WordPress HTML for better markdown conversion.
 
     Handles WordPress-specific elements:
@@ -280,19 +523,28 @@ def _preprocess_wordpress(soup: BeautifulSoup) -> None:
 
     Args:
         soup: BeautifulSoup object to modify in-place
+        index: NodeIndex of soup's current tree (built if omitted)
     """
+    if index is None:
+        index = NodeIndex(soup)
+
     # Preserve page title: move H1 from header into main content
-    # Look for H1 in common WordPress header locations
-    title_h1 = None
-    for selector in ["#Subheader h1.title", ".entry-title", ".page-title", "header h1"]:
-        title_h1 = soup.select_one(selector)
-        if title_h1:
-            break
+    title_h1 = _find_wordpress_title(index)
 
     if title_h1:
         # Find main content area to prepend the title
-        main_content = (
-            soup.find("main") or soup.find("article") or soup.find(id="Content") or soup.find(class_="entry-content")
+        main_content = next(
+            (
+                candidates[0]
+                for candidates in (
+                    index.by_tag.get("main"),
+                    index.by_tag.get("article"),
+                    [el for el in index.by_attr.get("id", ()) if el.get("id") == "Content"],
+                    index.by_class.get("entry-content"),
+                )
+                if candidates
+            ),
+            None,
         )
 
         if main_content:
@@ -301,37 +553,41 @@ def _preprocess_wordpress(soup: BeautifulSoup) -> None:
             title_copy.string = title_h1.get_text(strip=True)
             main_content.insert(0, title_copy)
 
-    # Remove fixed navigation (common in BeTheme and similar themes)
-    for selector in [".fixed-nav", ".fixed-nav-prev", ".fixed-nav-next"]:
-        for elem in soup.select(selector):
-            elem.decompose()
+    # Collect everything to remove, then tear it down in one pass
+    # One scan of the distinct class names covers both the exact and the fragment matches
+    victims: list[Tag] = [
+        el
+        for cls, els in index.by_class.items()
+        if cls in _WORDPRESS_REMOVE_CLASSES or any(fragment in cls for fragment in _WORDPRESS_REMOVE_CLASS_FRAGMENTS)
+        for el in els
+    ]
+
+    # Remove images with data:image/svg placeholder (lazy loading placeholders)
+    victims.extend(
+        img for img in index.by_tag.get("img", ()) if str(img.get("src") or "").startswith(_SVG_PLACEHOLDER_PREFIX)
+    )
 
-    # Remove post navigation
-    for selector in [".post-navigation", ".nav-links", ".post-pager"]:
-        for elem in soup.select(selector):
-            elem.decompose()
+    # Detach rather than decompose: decompose() also walks every removed node to
+    # clear it, while the whole soup is discarded after conversion anyway. An
+    # element listed twice, or already detached with an ancestor, is harmless.
+    for elem in victims:
+        elem.extract()
 
-    # Remove share widgets
-    for selector in [".share-simple-wrapper", ".sharedaddy", ".social-share"]:
-        for elem in soup.select(selector):
-            elem.decompose()
 
-    # Remove related posts sections
-    for selector in [".related-posts", ".section-post-related", ".yarpp-related"]:
-        for elem in soup.select(selector):
-            elem.decompose()
+# The one per-node lookup inside _preprocess_mkdocs_material that needs a descendant
+# combinator, compiled once at import. Single tag/class lookups use find()/find_all(),
+# which skip soupsieve's Python-level matcher and run 2-3x faster.
+_MKDOCS_TAB_LABELS = soupsieve.compile("div.tabbed-labels label")
 
-    # Remove rating/feedback forms
-    for selector in [".rich-reviews", ".feedback-form", "[class*='rating']", "[class*='review-form']"]:
-        for elem in soup.select(selector):
-            elem.decompose()
 
-    # Remove images with data:image/svg placeholder (lazy loading placeholders)
-    for img in soup.find_all("img", src=lambda x: x and x.startswith("data:image/svg+xml")):
-        img.decompose()
+def _is_detached(tag: Tag, root: BeautifulSoup) -> bool:
+    """Return True if tag no longer hangs off root, e.g. its ancestor was replaced."""
+    while tag.parent is not None:
+        tag = tag.parent
+    return tag is not root
 
 
-def _preprocess_mkdocs_material(soup: BeautifulSoup) -> None:
+def _preprocess_mkdocs_material(soup: BeautifulSoup, index: NodeIndex | None = None) -> None:
     """Preprocess MkDocs Material HTML for better markdown conversion.
 
     Handles MkDocs Material-specific elements:
@@ -342,18 +598,22 @@ def _preprocess_mkdocs_material(soup: BeautifulSoup) -> None:
 
     Args:
         soup: BeautifulSoup object to modify in-place
+        index: NodeIndex of soup's current tree (built if omitted)
     """
-    # 1. Strip permalink anchors from headings
-    for anchor in soup.select("a.headerlink"):
-        anchor.decompose()
+    if index is None:
+        index = NodeIndex(soup)
+
+    # 1. Strip permalink anchors from headings (detached, as in _remove_boilerplate)
+    for anchor in index.with_class(_HEADERLINK, "a"):
+        anchor.extract()
 
     # 2. Convert line-numbered code tables to proper code blocks
-    for table in soup.select("table.highlighttable"):
+    for table in index.with_class(_HIGHLIGHTTABLE, "table"):
         # Find the code cell
-        code_cell = table.select_one("td.code")
+        code_cell = table.find("td", class_="code")
         if code_cell:
             # Find the code element
-            code_elem = code_cell.select_one("code")
+            code_elem = code_cell.find("code")
             if code_elem:
                 # Get the text content, preserving line breaks
                 code_text = code_elem.get_text()
@@ -380,23 +640,31 @@ def _preprocess_mkdocs_material(soup: BeautifulSoup) -> None:
                 table.replace_with(new_pre)
 
     # 3. Convert admonitions to blockquotes with bold titles
-    for admonition in soup.select("div.admonition"):
+    for admonition in index.with_class(_ADMONITION, "div"):
+        # An admonition nested in one already flattened was dropped with it
+        if _is_detached(admonition, soup):
+            continue
+
         # Get the type (note, warning, tip, example, etc.)
         admon_type = "Note"
         for cls in admonition.get("class") or []:
-            if cls != "admonition":
+            if cls != _ADMONITION:
                 admon_type = cls.capitalize()
                 break
 
         # Get the title if present
-        title_elem = admonition.select_one("p.admonition-title")
+        title_elem = admonition.find("p", class_="admonition-title")
         title_text = title_elem.get_text(strip=True) if title_elem else admon_type
-        if title_elem:
-            title_elem.decompose()
+        if title_elem is not None and title_elem.parent is not admonition:
+            # A nested title would be repeated in its parent's text; a direct child
+            # is just skipped below, since the whole admonition is replaced anyway
+            title_elem.extract()
 
         # Get remaining content
         content_parts = []
         for child in admonition.children:
+            if child is title_elem:
+                continue
             if hasattr(child, "get_text"):
                 text = child.get_text(strip=True)
                 if text:
@@ -418,16 +686,19 @@ def _preprocess_mkdocs_material(soup: BeautifulSoup) -> None:
         admonition.replace_with(blockquote)
 
     # 4. Handle tabbed content - add language/tab headers
-    for tabbed_set in soup.select("div.tabbed-set"):
+    for tabbed_set in index.with_class(_TABBED_SET, "div"):
+        if _is_detached(tabbed_set, soup):
+            continue
+
         # Get tab labels
         labels = []
-        for label_elem in tabbed_set.select("div.tabbed-labels label"):
+        for label_elem in _MKDOCS_TAB_LABELS.select(tabbed_set):
             label_text = label_elem.get_text(strip=True)
             if label_text:
                 labels.append(label_text)
 
         # Get tab content blocks
-        tab_blocks = tabbed_set.select("div.tabbed-block")
+        tab_blocks = tabbed_set.find_all("div", class_="tabbed-block")
 
         # Create a container for the processed tabs
         container = soup.new_tag("div")
@@ -440,8 +711,7 @@ def _preprocess_mkdocs_material(soup: BeautifulSoup) -> None:
             container.append(header)
 
             # Append the block content
-            for child in list(block.children):
-                container.append(child.extract())
+            container.extend(block)
 
         tabbed_set.replace_with(container)
 
@@ -450,7 +720,8 @@ def _preprocess_mkdocs_material(soup: BeautifulSoup) -> None:
 # Preprocessor Registry
 # =============================================================================
 
-SITE_PREPROCESSORS: list[SitePreprocessor] = [
+# A tuple: _QUICK_SITE_RE is compiled from it at import, so it must not change afterwards
+SITE_PREPROCESSORS: tuple[SitePreprocessor, ...] = (
     SitePreprocessor(
         name="mkdocs_material",
         description=(
@@ -465,6 +736,15 @@ SITE_PREPROCESSORS: list[SitePreprocessor] = [
         ],
         detect=_detect_mkdocs_material,
         preprocess=_preprocess_mkdocs_material,
+        markers=(
+            "md-content",
+            "md-main",
+            "data-md-component",
+            "headerlink",
+            "admonition",
+            "tabbed-set",
+            "highlighttable",
+        ),
     ),
     SitePreprocessor(
         name="css_counter_lists",
@@ -477,6 +757,7 @@ SITE_PREPROCESSORS: list[SitePreprocessor] = [
         ],
         detect=_detect_css_counter_lists,
         preprocess=_preprocess_css_counter_lists,
+        markers=("data-list-level",),
     ),
     SitePreprocessor(
         name="wordpress",
@@ -490,6 +771,7 @@ SITE_PREPROCESSORS: list[SitePreprocessor] = [
         ],
         detect=_detect_wordpress,
         preprocess=_preprocess_wordpress,
+        markers=("wp-", "post-", "hentry", "entry-content", "generator"),
     ),
     # Add new preprocessors here following the same pattern:
     # SitePreprocessor(
@@ -498,31 +780,70 @@ SITE_PREPROCESSORS: list[SitePreprocessor] = [
     #     examples=["readthedocs.io sites"],
     #     detect=_detect_sphinx_rtd,
     #     preprocess=_preprocess_sphinx_rtd,
+    #     markers=("rst-content", "wy-nav"),
     # ),
-]
+)
+
+SITE_PREPROCESSORS_BY_NAME: dict[str, SitePreprocessor] = {p.name: p for p in SITE_PREPROCESSORS}
+
+
+def _compile_site_markers(preprocessors: tuple[SitePreprocessor, ...]) -> re.Pattern[str] | None:
+    """Union every preprocessor's markers into one pattern.
 
+    Returns None when any preprocessor declares no markers, since then no page
+    can be rejected without running its detector.
+    """
+    if not all(p.markers for p in preprocessors):
+        return None
+    markers = sorted({m for p in preprocessors for m in p.markers}, key=len, reverse=True)
+    # Attribute names are case-insensitive in HTML, so match markers the same way
+    return re.compile("|".join(map(re.escape, markers)), re.IGNORECASE)
+
+
+# Cheap pre-parse reject: a page containing none of these cannot match any preprocessor
+_QUICK_SITE_RE = _compile_site_markers(SITE_PREPROCESSORS)
 
-def apply_site_preprocessors(soup: BeautifulSoup) -> list[str]:
+
+def apply_site_preprocessors(soup: BeautifulSoup, html: str | None = None) -> list[str]:
     """Apply all matching site-specific preprocessors.
 
     Iterates through registered preprocessors, detects which ones apply,
-    and runs their preprocessing functions.
+    and runs their preprocessing functions against a shared NodeIndex.
 
     Args:
         soup: BeautifulSoup object to preprocess in-place
+        html: Raw HTML soup was parsed from. When given, pages containing no
+            preprocessor marker return immediately without walking the tree,
+            and only preprocessors whose own markers appear run detection.
 
     Returns:
         List of preprocessor names that were applied
     """
+    candidates = SITE_PREPROCESSORS
+    if html is not None:
+        if _QUICK_SITE_RE is not None and not _QUICK_SITE_RE.search(html):
+            return []
+        candidates = tuple(preprocessor for preprocessor in SITE_PREPROCESSORS if preprocessor.could_match(html))
+
     applied = []
-    for preprocessor in SITE_PREPROCESSORS:
+    # One traversal serves every detector; after a preprocessor has changed the tree
+    # it is only rebuilt if another candidate still needs it. Detection stays
+    # sequential: each detector must see the tree the previous preprocessor left, and
+    # against the index it is a few dict lookups, far below the cost of dispatching
+    # to a thread pool.
+    index: NodeIndex | None = None
+    for preprocessor in candidates:
+        if index is None:
+            index = NodeIndex(soup)
         try:
-            if preprocessor.detect(soup):
+            if preprocessor.detect(soup, index):
                 LOGGER.debug(f"Detected {preprocessor.name}, applying preprocessor")
-                preprocessor.preprocess(soup)
+                preprocessor.preprocess(soup, index)
                 applied.append(preprocessor.name)
+                index = None
         except Exception as e:
             LOGGER.warning(f"Preprocessor {preprocessor.name} failed: {e}")
+            index = None
     return applied
 
 
@@ -543,7 +864,7 @@ class AbsoluteUrlConverter(BaseMarkdownConverter):
     def convert_a(self, el, text, parent_tags):
         """Convert anchor tags, resolving relative URLs.
 
-        Strips javascript: pseudo-protocol links (UI interactions with no semantic meaning).
+        Strips javascript:/vbscript: pseudo-protocol links (UI interactions with no semantic meaning).
         """
         href = el.get("href", "")
         title = el.get("title", "")
@@ -556,9 +877,9 @@ class AbsoluteUrlConverter(BaseMarkdownConverter):
         if not text:
             return ""
 
-        # Strip javascript: pseudo-protocol links (case-insensitive) - remove entirely
+        # Strip javascript:/vbscript: pseudo-protocol links - remove entirely
         # These are UI controls (print, share, etc.) with no semantic content value
-        if href.lower().strip().startswith("javascript:"):
+        if _SCRIPT_PROTOCOL_RE.match(href):
             return ""
 
         # Resolve relative URL to absolute
@@ -723,6 +1044,24 @@ class MarkdownConverter:
         ".body-content",
     ]
 
+    def __init__(self, cache_size: int = _CONVERT_CACHE_SIZE):
+        """Initialize the converter.
+
+        Args:
+            cache_size: Number of converted documents to remember, keyed on a
+                digest of the HTML plus every conversion option. 0 disables caching.
+        """
+        self._cache_size = cache_size
+        self._cache: OrderedDict[tuple[Any, ...], str] = OrderedDict()
+        # Built once: markdownify resolves its options and caches a convert_* method
+        # per tag name on the instance, so reuse keeps that cache warm. Only
+        # base_url varies per call, and it is set just before each conversion.
+        self._markdownify = AbsoluteUrlConverter(**_MARKDOWNIFY_OPTIONS)
+        # Every boilerplate selector tests only the element itself (no sibling or
+        # structural pseudo-classes), so one compiled union in one walk finds the
+        # same elements as a select() per selector
+        self._boilerplate_selector = soupsieve.compile(", ".join(self.BOILERPLATE_SELECTORS))
+
     def convert(
         self,
         html: str,
@@ -756,10 +1095,30 @@ class MarkdownConverter:
         Returns:
             Clean markdown string
         """
-        if not html or not html.strip():
+        # Blank pages (empty bodies, bare redirects) never reach the parser; isspace() scans without copying
+        if not html or html.isspace():
             return ""
 
-        return self._convert_with_patterns(
+        # Key on a 128-bit digest of the HTML rather than the HTML itself. The markdown
+        # output is still retained, and only an exact repeat (same bytes, same options) hits
+        key: tuple[Any, ...] | None = None
+        if self._cache_size:
+            key = (
+                hashlib.blake2b(html.encode("utf-8", "surrogatepass"), digest_size=16).digest(),
+                base_url,
+                only_main_content,
+                remove_boilerplate,
+                tuple(include_tags) if include_tags is not None else None,
+                tuple(exclude_tags) if exclude_tags is not None else None,
+                content_mode,
+                query,
+            )
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        markdown = self._convert_with_patterns(
             html,
             base_url,
             only_main_content,
@@ -769,6 +1128,11 @@ class MarkdownConverter:
             content_mode=content_mode,
             query=query,
         )
+        if key is not None:
+            self._cache[key] = markdown
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return markdown
 
     def _convert_with_patterns(
         self,
@@ -797,57 +1161,50 @@ class MarkdownConverter:
             Markdown string
         """
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            soup = make_soup(html)
 
             if remove_boilerplate:
                 self._remove_boilerplate(soup)
 
             # Apply site-specific preprocessors (auto-detected)
-            apply_site_preprocessors(soup)
-
-            # Apply exclude_tags first (before include_tags)
-            if exclude_tags:
-                self._apply_exclude_tags(soup, exclude_tags)
+            apply_site_preprocessors(soup, html)
 
             content_element = None
 
+            # exclude_tags applies before include_tags; with both set, one walk does both.
             # include_tags takes precedence over only_main_content and the cascade.
-            if include_tags:
+            if include_tags and exclude_tags:
+                content_element = self._apply_exclude_and_include_tags(soup, exclude_tags, include_tags)
+            elif include_tags:
                 content_element = self._apply_include_tags(soup, include_tags)
-            elif only_main_content:
-                from supacrawl.services.content_filter import extract as cf_extract
-
-                content_element = cf_extract(
-                    soup=soup,
-                    html=html,
-                    main_content_selectors=self.MAIN_CONTENT_SELECTORS,
-                    content_mode=content_mode,
-                    query=query,
-                )
-
-            if content_element:
-                html_to_convert = str(content_element)
             else:
-                body = soup.find("body")
-                html_to_convert = str(body) if body else str(soup)
-
-            converter = AbsoluteUrlConverter(
-                base_url=base_url,
-                heading_style="atx",
-                bullets="-",
-                code_language="",
-                strip=["script", "style", "nav", "footer", "header"],
-                wrap=False,
-                wrap_width=0,
-            )
-            markdown = converter.convert(html_to_convert)
+                if exclude_tags:
+                    self._apply_exclude_tags(soup, exclude_tags)
+                if only_main_content:
+                    from supacrawl.services.content_filter import extract as cf_extract
+
+                    content_element = cf_extract(
+                        soup=soup,
+                        html=html,
+                        main_content_selectors=self.MAIN_CONTENT_SELECTORS,
+                        content_mode=content_mode,
+                        query=query,
+                    )
+
+            # Hand markdownify the tree itself: its convert() would serialise it to a
+            # string only to parse that string straight back into a second soup
+            body = soup.find("body")
+            to_convert = content_element or (body if isinstance(body, Tag) else soup)
+
+            self._markdownify.base_url = base_url
+            markdown = self._markdownify.convert_soup(to_convert)
 
             return self._clean_whitespace(markdown)
 
         except Exception as e:
             LOGGER.warning(f"Pattern-based conversion failed: {e}")
             try:
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
                 return soup.get_text(separator="\n\n", strip=True)
             except Exception:
                 return ""
@@ -855,16 +1212,27 @@ class MarkdownConverter:
     def _apply_exclude_tags(self, soup: BeautifulSoup, exclude_tags: list[str]) -> None:
         """Remove elements matching exclude_tags selectors.
 
+        Valid selectors are joined into one union and matched in a single walk.
+        Selectors that look at siblings or descendants would see the removals
+        made by the selectors before them, so those keep one pass per selector.
+
         Args:
             soup: BeautifulSoup object to modify in-place
             exclude_tags: List of CSS selectors for elements to remove
         """
-        for selector in exclude_tags:
-            try:
-                for element in soup.select(selector):
-                    element.decompose()
-            except Exception as e:
-                LOGGER.warning(f"Invalid exclude_tags selector '{selector}': {e}")
+        if not any(
+            _LOOKAHEAD_SELECTOR_RE.search(selector) or _SIBLING_SELECTOR_RE.search(selector)
+            for selector in exclude_tags
+        ):
+            union = self._compile_union(exclude_tags, "exclude_tags")
+            if union is not None:
+                for element in union.select(soup):
+                    element.extract()
+            return
+
+        for selector in self._compile_selectors(exclude_tags, "exclude_tags"):
+            for element in selector.select(soup):
+                element.extract()
 
     def _apply_include_tags(self, soup: BeautifulSoup, include_tags: list[str]) -> Tag | None:
         """Extract only elements matching include_tags selectors.
@@ -878,15 +1246,107 @@ class MarkdownConverter:
         """
         matched_elements: list[Tag] = []
 
-        for selector in include_tags:
-            try:
-                for element in soup.select(selector):
-                    # Avoid duplicates (e.g., nested matches)
-                    if element not in matched_elements:
-                        matched_elements.append(element)
-            except Exception as e:
-                LOGGER.warning(f"Invalid include_tags selector '{selector}': {e}")
+        for selector in self._compile_selectors(include_tags, "include_tags"):
+            matched_elements.extend(selector.select(soup))
+
+        return self._wrap_included(soup, matched_elements)
+
+    def _apply_exclude_and_include_tags(
+        self, soup: BeautifulSoup, exclude_tags: list[str], include_tags: list[str]
+    ) -> Tag | None:
+        """Remove exclude_tags matches and extract include_tags matches in one walk.
+
+        Equivalent to _apply_exclude_tags followed by _apply_include_tags. The walk
+        visits elements in document order, detaches excluded ones on the spot
+        (never descending into them) and tests the survivors against include_tags,
+        so every include test already sees the exclusions that precede it.
+        Selectors that look at what follows an element (:has(), :last-child, ...),
+        or exclude_tags selectors that look at preceding siblings (which would see
+        their own removals), fall back to the two separate passes.
+
+        Args:
+            soup: BeautifulSoup object to modify in-place
+            exclude_tags: List of CSS selectors for elements to remove
+            include_tags: List of CSS selectors for elements to include
+
+        Returns:
+            A wrapper Tag containing all matched elements, or None if no matches
+        """
+        if any(_LOOKAHEAD_SELECTOR_RE.search(selector) for selector in (*exclude_tags, *include_tags)) or any(
+            _SIBLING_SELECTOR_RE.search(selector) for selector in exclude_tags
+        ):
+            self._apply_exclude_tags(soup, exclude_tags)
+            return self._apply_include_tags(soup, include_tags)
+
+        excludes = self._compile_union(exclude_tags, "exclude_tags")
+        includes = self._compile_selectors(include_tags, "include_tags")
+        # One list per include selector, so matches keep selector-then-document order
+        matches: list[list[Tag]] = [[] for _ in includes]
+
+        stack = [child for child in reversed(soup.contents) if isinstance(child, Tag)]
+        while stack:
+            element = stack.pop()
+            if excludes is not None and excludes.match(element):
+                element.extract()
+                continue
+            for selector, matched in zip(includes, matches, strict=True):
+                if selector.match(element):
+                    matched.append(element)
+            stack.extend(child for child in reversed(element.contents) if isinstance(child, Tag))
+
+        return self._wrap_included(soup, [element for matched in matches for element in matched])
+
+    @staticmethod
+    def _compile_selectors(selectors: list[str], option: str) -> list[Any]:
+        """Compile CSS selectors, logging and skipping invalid ones.
 
+        Args:
+            selectors: CSS selectors to compile
+            option: Option name the selectors came from, for the warning
+
+        Returns:
+            Compiled soupsieve selectors, in input order
+        """
+        compiled = []
+        for selector in selectors:
+            sieve, error = _compile_selector(selector)
+            if sieve is None:
+                LOGGER.warning(f"Invalid {option} selector '{selector}': {error}")
+            else:
+                compiled.append(sieve)
+        return compiled
+
+    @classmethod
+    def _compile_union(cls, selectors: list[str], option: str) -> Any | None:
+        """Compile the valid selectors into a single union selector.
+
+        Args:
+            selectors: CSS selectors to combine
+            option: Option name the selectors came from, for the warning
+
+        Returns:
+            One compiled soupsieve selector, or None if no selector was valid
+        """
+        compiled = cls._compile_selectors(selectors, option)
+        if not compiled:
+            return None
+        return _compile_selector(", ".join(selector.pattern for selector in compiled))[0]
+
+    @staticmethod
+    def _wrap_included(soup: BeautifulSoup, matched_elements: list[Tag]) -> Tag | None:
+        """Move matched include_tags elements into a wrapper div.
+
+        Args:
+            soup: BeautifulSoup object for creating the wrapper
+            matched_elements: Matches in output order; an element matched by more
+                than one selector is kept at its first position
+
+        Returns:
+            The wrapper Tag, or None if nothing matched
+        """
+        # Deduplicate by identity: Tag equality compares whole subtrees, which is
+        # quadratic over the matches and would merge distinct but identical elements
+        matched_elements = list({id(element): element for element in matched_elements}.values())
         if not matched_elements:
             LOGGER.debug("No elements matched include_tags selectors")
             return None
@@ -901,27 +1361,26 @@ class MarkdownConverter:
         return wrapper
 
     def _remove_boilerplate(self, soup: BeautifulSoup) -> None:
-        """Remove boilerplate elements in-place."""
+        """Remove boilerplate elements in-place.
+
+        Elements are detached with extract() rather than decompose(), which would
+        also walk each removed subtree to clear it; the soup is discarded after
+        conversion, so the detached subtrees are freed with it.
+        """
         # Remove always-unwanted tags (scripts, styles, etc.)
-        for tag_name in self.REMOVE_TAGS:
-            for tag in soup.find_all(tag_name):
-                tag.decompose()
+        for tag in soup.find_all(self.REMOVE_TAGS):
+            tag.extract()
 
         # Remove structural boilerplate (nav, footer, etc.)
-        for tag_name in self.BOILERPLATE_TAGS:
-            for tag in soup.find_all(tag_name):
-                # Don't remove if it's the main content area
-                if not self._is_main_content(tag):
-                    tag.decompose()
+        for tag in soup.find_all(self.BOILERPLATE_TAGS):
+            # Don't remove if it's the main content area
+            if not self._is_main_content(tag):
+                tag.extract()
 
         # Remove elements matching boilerplate CSS selectors
-        for selector in self.BOILERPLATE_SELECTORS:
-            try:
-                for element in soup.select(selector):
-                    if not self._is_main_content(element):
-                        element.decompose()
-            except Exception:
-                pass
+        for element in self._boilerplate_selector.select(soup):
+            if not self._is_main_content(element):
+                element.extract()
 
     def _is_main_content(self, element) -> bool:
         """Check if element is likely main content."""
@@ -941,20 +1400,11 @@ class MarkdownConverter:
             return False
 
     def _clean_whitespace(self, markdown: str) -> str:
-        """Clean up excessive whitespace."""
-        lines = []
-        prev_empty = False
-
-        for line in markdown.splitlines():
-            stripped = line.rstrip()
-            is_empty = not stripped
-
-            if is_empty:
-                if not prev_empty:
-                    lines.append("")
-                prev_empty = True
-            else:
-                lines.append(stripped)
-                prev_empty = False
+        """Clean up excessive whitespace.
 
-        return "\n".join(lines).strip()
+        Strips trailing whitespace from every line and collapses runs of blank
+        lines into one. splitlines() and rstrip() run in C, so the only Python
+        work per line is the list comprehension; blank runs are then one regex pass.
+        """
+        markdown = "\n".join([line.rstrip() for line in markdown.splitlines()])
+        return _BLANK_RUNS_RE.sub("\n\n", markdown).strip()
@@ -1,8 +1,12 @@
 """Crawl service for full-site scraping."""
 
+import fnmatch
 import hashlib
 import json
 import logging
+import os
+import re
+from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING, AsyncGenerator, Literal
 from urllib.parse import urlparse
@@ -34,6 +38,19 @@ def _url_origin(url: str) -> str:
     return f"{parsed.scheme}://{parsed.netloc.split(':')[0]}{port}"
 
 
+@lru_cache(maxsize=256)
+def _compile_patterns(patterns: tuple[str, ...]) -> re.Pattern[str]:
+    """Compile glob patterns into one regex matching any of them.
+
+    Args:
+        patterns: fnmatch-style glob patterns.
+
+    Returns:
+        A compiled union of the translated patterns.
+    """
+    return re.compile("|".join(f"(?:{fnmatch.translate(os.path.normcase(p))})" for p in patterns))
+
+
 def _scope_headers_to_origin(
     headers: dict[str, str] | None,
     target_url: str,
@@ -66,6 +83,11 @@ def _scope_headers_to_origin(
 
 LOGGER = logging.getLogger(__name__)
 
+# Pages saved during a crawl are appended here, one JSON line each, and folded
+# into manifest.json when the crawl ends. Appending keeps each save O(1) instead
+# of rewriting the whole manifest, and an interrupted crawl still resumes from it.
+_MANIFEST_LOG_NAME = "manifest.jsonl"
+
 # Type alias for wait_until options
 type WaitUntilType = Literal["commit", "domcontentloaded", "load", "networkidle"]
 
@@ -284,6 +306,13 @@ class CrawlService:
                 type="error",
                 error=str(e),
             )
+        finally:
+            # Also runs when the consumer stops iterating early
+            if output_dir:
+                self._compact_manifest(output_dir)
+            # Flushes the cache index of a scrape service this crawl built itself
+            if self._scrape_service is not None and self._scrape_service is not self._injected_scrape_service:
+                await self._scrape_service.close()
 
     async def _crawl_inner(
         self,
@@ -521,6 +550,9 @@ class CrawlService:
         if wants_change_tracking:
             change_summary = {k: v for k, v in change_counts.items() if v > 0}
 
+        if output_dir:
+            self._compact_manifest(output_dir)
+
         # Final complete event
         yield CrawlEvent(
             type="complete",
@@ -539,9 +571,9 @@ class CrawlService:
         Returns:
             True if URL matches any pattern
         """
-        import fnmatch
-
-        return any(fnmatch.fnmatch(url, pattern) for pattern in patterns)
+        if not patterns:
+            return False
+        return _compile_patterns(tuple(patterns)).match(os.path.normcase(url)) is not None
 
     def _load_resume_state(self, output_dir: Path) -> set[str]:
         """Load URLs that have already been scraped.
@@ -552,16 +584,53 @@ class CrawlService:
         Returns:
             Set of already-scraped URLs
         """
-        scraped = set()
+        return set(self._read_manifest(output_dir))
+
+    def _read_manifest(self, output_dir: Path) -> list[str]:
+        """Read scraped URLs from manifest.json followed by the append-only log.
+
+        A trailing line cut short by an interrupted write is ignored.
+
+        Args:
+            output_dir: Output directory
+
+        Returns:
+            Scraped URLs in the order they were saved
+        """
+        scraped: list[str] = []
         manifest_path = output_dir / "manifest.json"
+        log_path = output_dir / _MANIFEST_LOG_NAME
 
         if manifest_path.exists():
             with open(manifest_path) as f:
                 manifest = json.load(f)
-                scraped = set(manifest.get("scraped_urls", []))
+                scraped.extend(manifest.get("scraped_urls", []))
+
+        if log_path.exists():
+            with open(log_path) as f:
+                for line in f:
+                    try:
+                        scraped.append(json.loads(line)["url"])
+                    except json.JSONDecodeError, KeyError, TypeError:
+                        LOGGER.debug(f"Skipping unreadable manifest log line: {line!r}")
 
         return scraped
 
+    def _compact_manifest(self, output_dir: Path) -> None:
+        """Fold the append-only log into manifest.json and remove the log.
+
+        Args:
+            output_dir: Output directory
+        """
+        log_path = output_dir / _MANIFEST_LOG_NAME
+        if not log_path.exists():
+            return
+
+        scraped = self._read_manifest(output_dir)
+        with open(output_dir / "manifest.json", "w") as f:
+            json.dump({"scraped_urls": scraped}, f, indent=2)
+        log_path.unlink()
+
     def _save_page(self, output_dir: Path, url: str, data: ScrapeData) -> None:
         """Save scraped page to output directory.
 
@@ -618,16 +687,6 @@ class CrawlService:
                         indent=2,
                     )
 
-        # Always update manifest for resume capability
-        manifest_path = output_dir / "manifest.json"
-        manifest: dict[str, list[str]] = {"scraped_urls": []}
-        if manifest_path.exists():
-            with open(manifest_path) as f:
-                manifest = json.load(f)
-
-        if "scraped_urls" not in manifest:
-            manifest["scraped_urls"] = []
-
-        manifest["scraped_urls"].append(url)
-        with open(manifest_path, "w") as f:
-            json.dump(manifest, f, indent=2)
+        # Always record the page for resume capability; compacted into manifest.json
+        with open(output_dir / _MANIFEST_LOG_NAME, "a") as f:
+            f.write(json.dumps({"url": url}) + "\n")
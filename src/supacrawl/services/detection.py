@@ -84,6 +84,13 @@ _JS_EXECUTABLE_SCRIPT_RE = re.compile(
     r'<script(?![^>]*\s+type\s*=\s*["\'][^"\']*(?:json|template)[^"\']*["\'])[^>]*>(.*?)</script>',
     re.DOTALL | re.IGNORECASE,
 )
+# Body extraction and visible-text stripping for the empty-body guard, compiled
+# once rather than looked up in re's pattern cache on every fetched page.
+# Scripts are stripped before styles, so the two are kept as separate passes.
+_BODY_RE = re.compile(r"<body[^>]*>(.*?)</body>", re.DOTALL | re.IGNORECASE)
+_SCRIPT_BLOCK_RE = re.compile(r"<script[^>]*>.*?</script>", re.DOTALL | re.IGNORECASE)
+_STYLE_BLOCK_RE = re.compile(r"<style[^>]*>.*?</style>", re.DOTALL | re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]+>")
 
 
 def detect_cdn(headers: dict[str, str]) -> str | None:
@@ -219,7 +226,7 @@ def estimate_js_requirement(html: str, content_length: int) -> bool:
 
     # An effectively empty <body> (once scripts/styles/tags are stripped) means
     # the real content is injected client-side.
-    body_match = re.search(r"<body[^>]*>(.*?)</body>", html, re.DOTALL | re.IGNORECASE)
+    body_match = _BODY_RE.search(html)
     if body_match:
         body_content = body_match.group(1).strip()
 
@@ -228,9 +235,9 @@ def estimate_js_requirement(html: str, content_length: int) -> bool:
         script_blocks = _JS_EXECUTABLE_SCRIPT_RE.findall(body_content)
         script_chars = sum(len(s) for s in script_blocks)
 
-        body_text = re.sub(r"<script[^>]*>.*?</script>", "", body_content, flags=re.DOTALL | re.IGNORECASE)
-        body_text = re.sub(r"<style[^>]*>.*?</style>", "", body_text, flags=re.DOTALL | re.IGNORECASE)
-        body_text = re.sub(r"<[^>]+>", "", body_text)
+        body_text = _SCRIPT_BLOCK_RE.sub("", body_content)
+        body_text = _STYLE_BLOCK_RE.sub("", body_text)
+        body_text = _TAG_RE.sub("", body_text)
         body_text = body_text.strip()
 
         # Guard 2: visible text so sparse that the body carries no real content.
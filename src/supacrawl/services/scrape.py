@@ -46,7 +46,7 @@ from supacrawl.models import (
 )
 from supacrawl.quality import assess_quality
 from supacrawl.services.browser import BrowserManager, BrowserUnavailableError, PageContent, PageMetadata
-from supacrawl.services.converter import MarkdownConverter
+from supacrawl.services.converter import MarkdownConverter, make_soup
 from supacrawl.services.detection import detect_bot_protection, estimate_js_requirement
 from supacrawl.services.http_fetch import fetch_static
 from supacrawl.services.platform import detect_platform
@@ -55,6 +55,11 @@ from supacrawl.services.structured_data import extract_structured_data
 
 LOGGER = logging.getLogger(__name__)
 
+# Conversion cache for the converter a ScrapeService builds for itself. The service
+# lives as long as the MCP/API process, so it keeps only enough entries to absorb
+# exact re-conversions of recent pages rather than MarkdownConverter's default.
+_SCRAPE_CONVERT_CACHE_SIZE = 32
+
 # Type alias for wait_until options
 type WaitUntilType = Literal["commit", "domcontentloaded", "load", "networkidle"]
 
@@ -657,7 +662,7 @@ class ScrapeService:
                 MCP boundaries; opt-out via SUPACRAWL_METRICS=0).
         """
         self._browser = browser
-        self._converter = converter or MarkdownConverter()
+        self._converter = converter or MarkdownConverter(cache_size=_SCRAPE_CONVERT_CACHE_SIZE)
         self._owns_browser = browser is None
         self._locale_config = locale_config
         self._stealth = stealth
@@ -675,9 +680,11 @@ class ScrapeService:
         """Close the scrape service.
 
         BrowserManager instances are created and torn down per-request inside
-        scrape(), so there are no held resources to release here. This method
-        exists to satisfy the uniform service lifecycle expected by callers.
+        scrape(), so the only thing to release is the cache, whose index
+        mutations are written back here.
         """
+        if self._cache:
+            self._cache.close()
 
     async def scrape(
         self,
@@ -1002,34 +1009,39 @@ class ScrapeService:
                 firefox_user_prefs=firefox_user_prefs,
                 strategy_store=self._strategy_store,
             )
-            return await next_service.scrape(
-                url=url,
-                formats=formats,
-                only_main_content=(only_main_content if retry_only_main_content is None else retry_only_main_content),
-                wait_for=max(wait_for, retry_wait_for),
-                timeout=timeout,
-                screenshot_full_page=screenshot_full_page,
-                actions=(actions if retry_actions is None else retry_actions),
-                json_schema=json_schema,
-                json_prompt=json_prompt,
-                include_tags=include_tags,
-                exclude_tags=exclude_tags,
-                max_age=max_age,
-                wait_until=wait_until,
-                change_tracking_modes=change_tracking_modes,
-                expand_iframes=(expand_iframes if retry_expand_iframes is None else retry_expand_iframes),  # type: ignore[arg-type]
-                expand_disclosures=expand_disclosures,
-                device=device,
-                parse_pdf=parse_pdf,
-                engine=engine,
-                headers=headers,
-                content_mode=content_mode,
-                query=query,
-                http_first=False,
-                expect=expect,
-                escalate=escalate,
-                _escalation_level=_escalation_level + 1,
-            )
+            try:
+                return await next_service.scrape(
+                    url=url,
+                    formats=formats,
+                    only_main_content=(
+                        only_main_content if retry_only_main_content is None else retry_only_main_content
+                    ),
+                    wait_for=max(wait_for, retry_wait_for),
+                    timeout=timeout,
+                    screenshot_full_page=screenshot_full_page,
+                    actions=(actions if retry_actions is None else retry_actions),
+                    json_schema=json_schema,
+                    json_prompt=json_prompt,
+                    include_tags=include_tags,
+                    exclude_tags=exclude_tags,
+                    max_age=max_age,
+                    wait_until=wait_until,
+                    change_tracking_modes=change_tracking_modes,
+                    expand_iframes=(expand_iframes if retry_expand_iframes is None else retry_expand_iframes),  # type: ignore[arg-type]
+                    expand_disclosures=expand_disclosures,
+                    device=device,
+                    parse_pdf=parse_pdf,
+                    engine=engine,
+                    headers=headers,
+                    content_mode=content_mode,
+                    query=query,
+                    http_first=False,
+                    expect=expect,
+                    escalate=escalate,
+                    _escalation_level=_escalation_level + 1,
+                )
+            finally:
+                await next_service.close()
 
         try:
             # Create browser if needed, or use a temporary one for an engine/proxy override
@@ -1763,9 +1775,7 @@ class ScrapeService:
         # misjudge any page merely *mentioning* a bot keyword (the ubiquitous
         # ``<meta name="robots">`` tag matches the BOT_DETECTION_REGEX) as empty
         # and defeat the fast path for most real pages.
-        density_text = (
-            markdown if markdown is not None else BeautifulSoup(html, "html.parser").get_text(" ", strip=True)
-        )
+        density_text = markdown if markdown is not None else make_soup(html).get_text(" ", strip=True)
 
         # Bot challenge or block (status codes, near-empty challenge pages).
         if _looks_like_bot_block(fetched.status_code, html, density_text):
@@ -1950,7 +1960,7 @@ class ScrapeService:
         # flips success to False so a caller never passes a block page downstream.
         quality_text = markdown
         if quality_text is None and page_content.html:
-            quality_text = BeautifulSoup(page_content.html, "html.parser").get_text(" ", strip=True)
+            quality_text = make_soup(page_content.html).get_text(" ", strip=True)
         quality = assess_quality(
             status_code=page_content.status_code,
             html=page_content.html,
@@ -2165,7 +2175,7 @@ class ScrapeService:
         """
         from urllib.parse import urljoin, urlparse
 
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         links: list[str] = []
         for anchor in soup.find_all("a", href=True):
             href = anchor["href"]
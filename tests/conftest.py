@@ -1,9 +1,15 @@
 """Pytest configuration and shared fixtures for supacrawl tests."""
 
+import copy
+import functools
 import os
+import re
+import socket
+from collections.abc import Callable
 from pathlib import Path
 
 import pytest
+from bs4 import BeautifulSoup
 
 # Keep per-domain strategy memory (#130) and field telemetry (#137) off by default
 # in tests so a test that drives the CLI/MCP scrape path cannot write to the
@@ -31,6 +37,8 @@ _SEARCH_ENV_VARS = (
 )
 
 from supacrawl.benchmark.models import CaseMetrics, CaseResult  # noqa: E402
+from supacrawl.services.converter import MarkdownConverter  # noqa: E402
+from supacrawl.services.converter import make_soup as _make_soup  # noqa: E402
 
 
 @pytest.fixture(autouse=True)
@@ -95,6 +103,30 @@ def make_case_result(
     )
 
 
+def missing_substrings(text: str, *substrings: str) -> list[str]:
+    """Return the substrings that do not occur in text, in argument order.
+
+    One compiled alternation finds every substring in a single scan of text
+    instead of one ``in`` scan per substring, which adds up on large converted
+    pages. Alternation matches cannot overlap, so anything the scan misses is
+    confirmed with a plain ``in`` check before it is reported.
+
+    Use as ``assert missing_substrings(md, "a", "b") == []`` so a failure
+    names exactly what is absent.
+
+    Args:
+        text: Text to search.
+        *substrings: Substrings that must all occur in text.
+
+    Returns:
+        The substrings not found, empty when all are present.
+    """
+    # Longest first, so a substring that prefixes another cannot shadow it
+    pattern = re.compile("|".join(map(re.escape, sorted(set(substrings), key=len, reverse=True))))
+    found = {m.group() for m in pattern.finditer(text)}
+    return [s for s in substrings if s not in found and s not in text]
+
+
 def pytest_configure(config: pytest.Config) -> None:
     """Register custom markers."""
     config.addinivalue_line("markers", "unit: Pure logic tests with no I/O, network, or browser")
@@ -103,6 +135,22 @@ def pytest_configure(config: pytest.Config) -> None:
         "markers",
         "e2e: End-to-end tests with live network, Playwright, or external services",
     )
+    config.addinivalue_line("markers", "requires_network: Skipped when the internet is unreachable")
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register supacrawl's command-line options."""
+    parser.addoption(
+        "--supacrawl-cdp-url",
+        default=os.getenv("SUPACRAWL_CDP_URL"),
+        help="CDP endpoint of a running Chromium (e.g. http://localhost:9222) for E2E browser fixtures to share",
+    )
+    parser.addoption(
+        "--run-e2e",
+        action="store_true",
+        default=False,
+        help="Run e2e tests too; without it they are deselected unless -m selects them",
+    )
 
 
 def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
@@ -111,7 +159,16 @@ def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item
 
     Tests should use explicit markers (@pytest.mark.unit, @pytest.mark.e2e).
     Unmarked tests default to unit.
+
+    e2e tests hit the live network, so a plain run deselects them; pass --run-e2e,
+    or an explicit -m expression, to choose them.
     """
+    if not config.getoption("--run-e2e") and not config.option.markexpr:
+        deselected = [item for item in items if item.get_closest_marker("e2e") is not None]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = [item for item in items if item.get_closest_marker("e2e") is None]
+
     for item in items:
         # Skip if already has a category marker
         markers = list(item.iter_markers())
@@ -123,9 +180,72 @@ def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item
         item.add_marker(pytest.mark.unit)
 
 
+@functools.lru_cache(maxsize=128)
+def _parsed_soup(html: str) -> BeautifulSoup:
+    """Parse HTML once per worker; callers must only ever see copies of the result."""
+    return _make_soup(html)
+
+
+@pytest.fixture
+def make_soup() -> Callable[[str], BeautifulSoup]:
+    """Parse HTML with the same tree builder the converter uses in production.
+
+    Preprocessor tests must see the tree shape ``MarkdownConverter`` produces
+    (lxml, or html.parser when lxml is unavailable), not whatever parser the
+    test happens to name.
+
+    Many tests parse the same fragment, so each HTML string is parsed once and
+    every call hands out a deep copy. Preprocessors mutate the tree in place,
+    and the copy keeps those mutations out of the cached parse.
+
+    Returns:
+        Callable taking raw HTML and returning a fresh ``BeautifulSoup``.
+    """
+    return lambda html: copy.copy(_parsed_soup(html))
+
+
+@pytest.fixture(scope="session")
+def converter() -> MarkdownConverter:
+    """Share one ``MarkdownConverter`` across the session.
+
+    The instance carries two pieces of state between calls: its result cache,
+    keyed on the HTML and every conversion option, and the reused markdownify
+    instance, whose ``base_url`` each ``convert()`` overwrites before converting
+    (``test_base_url_does_not_leak_between_calls`` pins that). Both are safe to
+    share. Tests that monkeypatch converter internals must build their own
+    instance, as must tests comparing two calls whose options share a cache key.
+    """
+    return MarkdownConverter()
+
+
 # E2E test fixtures
 
 
+@pytest.fixture(scope="session")
+def cdp_url(pytestconfig: pytest.Config) -> str | None:
+    """CDP endpoint for shared-browser fixtures to connect to, or None to launch their own."""
+    return pytestconfig.getoption("--supacrawl-cdp-url")
+
+
+@pytest.fixture(scope="session")
+def network_available() -> bool:
+    """Whether the internet is reachable, probed once per session."""
+    try:
+        with socket.create_connection(("1.1.1.1", 443), timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+@pytest.fixture(autouse=True)
+def _skip_if_offline(request: pytest.FixtureRequest) -> None:
+    """Skip ``requires_network`` tests up front rather than letting each wait out its timeouts."""
+    if request.node.get_closest_marker("requires_network") is None:
+        return
+    if not request.getfixturevalue("network_available"):
+        pytest.skip("network unavailable")
+
+
 @pytest.fixture
 def test_urls() -> list[str]:
     """Common test URLs for E2E tests."""
@@ -446,6 +446,40 @@ class TestBrowserPreflightSSRF:
             await manager.extract_links("http://evil.example.com/")
 
 
+class TestBrowserCDPConnect:
+    """With ``cdp_url`` set, ``start()`` attaches to a running Chromium instead of launching one."""
+
+    @pytest.mark.asyncio
+    async def test_start_connects_over_cdp_instead_of_launching(self, monkeypatch):
+        calls: list[tuple[str, Any]] = []
+
+        class _FakeChromium:
+            async def connect_over_cdp(self, endpoint: str) -> object:
+                calls.append(("connect", endpoint))
+                return object()
+
+            async def launch(self, **options: Any) -> object:
+                calls.append(("launch", options))
+                return object()
+
+        class _FakePlaywright:
+            chromium = _FakeChromium()
+
+            async def start(self) -> "_FakePlaywright":
+                return self
+
+        manager = BrowserManager(cdp_url="http://localhost:9222")
+        monkeypatch.setattr(manager, "_get_playwright_module", lambda: _FakePlaywright)
+
+        await manager.start()
+
+        assert calls == [("connect", "http://localhost:9222")]
+
+    def test_camoufox_rejects_cdp_url(self):
+        with pytest.raises(ValueError, match="cdp_url"):
+            BrowserManager(engine="camoufox", cdp_url="http://localhost:9222")
+
+
 class TestNavigationGuardRouteHandler:
     """``_install_navigation_guard`` re-validates every request a page makes.
 
@@ -1,12 +1,32 @@
 """Tests for CacheManager."""
 
+import gc
 import json
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
 
 from supacrawl.cache import CacheEntry, CacheManager
+from supacrawl.exceptions import ValidationError
+
+
+@pytest.fixture(scope="module")
+def readonly_cache(tmp_path_factory: pytest.TempPathFactory) -> CacheManager:
+    """A CacheManager shared by tests that never write to the cache.
+
+    Key derivation and URL normalisation are pure, so these tests reuse one
+    instance instead of building a fresh cache directory per test. Tests that
+    set, clear, or prune entries use the per-test ``cache_manager`` fixture.
+    """
+    return CacheManager(tmp_path_factory.mktemp("readonly_cache"))
+
+
+@pytest.fixture(scope="module")
+def shared_cache(tmp_path_factory: pytest.TempPathFactory) -> CacheManager:
+    """A CacheManager reused across round-trip cases; each case clears it first."""
+    return CacheManager(tmp_path_factory.mktemp("shared_cache"))
 
 
 class TestCacheManager:
@@ -32,49 +52,119 @@ class TestCacheManager:
         assert cache_dir.exists()
         assert (cache_dir / "pages").exists()
 
-    def test_cache_key_is_deterministic(self, cache_manager: CacheManager) -> None:
+    def test_cache_key_is_deterministic(self, readonly_cache: CacheManager) -> None:
         """Test that same URL produces same cache key."""
         url = "https://example.com/page"
-        key1 = cache_manager._cache_key(url)
-        key2 = cache_manager._cache_key(url)
+        key1 = readonly_cache._cache_key(url)
+        key2 = readonly_cache._cache_key(url)
 
         assert key1 == key2
         assert len(key1) == 16  # SHA256[:16]
 
-    def test_normalise_url_removes_fragment(self, cache_manager: CacheManager) -> None:
+    def test_normalise_url_removes_fragment(self, readonly_cache: CacheManager) -> None:
         """Test that URL fragments are removed."""
         url = "https://example.com/page#section"
-        normalised = cache_manager._normalise_url(url)
+        normalised = readonly_cache._normalise_url(url)
 
         assert "#section" not in normalised
         assert "example.com/page" in normalised
 
-    def test_normalise_url_removes_tracking_params(self, cache_manager: CacheManager) -> None:
+    def test_normalise_url_removes_tracking_params(self, readonly_cache: CacheManager) -> None:
         """Test that tracking parameters are removed."""
         url = "https://example.com/page?utm_source=google&id=123"
-        normalised = cache_manager._normalise_url(url)
+        normalised = readonly_cache._normalise_url(url)
 
         assert "utm_source" not in normalised
         assert "id=123" in normalised
 
-    def test_set_and_get(self, cache_manager: CacheManager) -> None:
-        """Test basic set and get operations."""
+    @pytest.mark.parametrize(
+        ("set_url", "set_variant", "get_url", "get_variant", "expected"),
+        [
+            pytest.param(
+                "https://example.com/page",
+                None,
+                "https://example.com/page",
+                None,
+                {"success": True, "data": {"markdown": "# Test"}},
+                id="set-and-get",
+            ),
+            pytest.param(None, None, "https://example.com/uncached", None, None, id="not-cached"),
+            pytest.param(
+                "https://example.com/page",
+                None,
+                "https://example.com/page?utm_source=google",
+                None,
+                {"success": True, "data": {"markdown": "# Test"}},
+                id="tracking-params-share-entry",
+            ),
+            pytest.param(
+                "https://example.com/page",
+                "screenshot_full_page=False",
+                "https://example.com/page",
+                None,
+                None,
+                id="variant-not-served-without-variant",
+            ),
+            pytest.param(
+                "https://example.com/page",
+                "screenshot_full_page=False",
+                "https://example.com/page",
+                "screenshot_full_page=False",
+                {"success": True, "data": {"markdown": "# Test"}},
+                id="variant-round-trip",
+            ),
+        ],
+    )
+    def test_set_get_roundtrip(
+        self,
+        shared_cache: CacheManager,
+        set_url: str | None,
+        set_variant: str | None,
+        get_url: str,
+        get_variant: str | None,
+        expected: dict[str, object] | None,
+    ) -> None:
+        """Test set/get round-trips, including misses, URL normalisation and variants."""
+        shared_cache.clear()
+        if set_url is not None:
+            shared_cache.set(set_url, {"success": True, "data": {"markdown": "# Test"}}, 3600, variant=set_variant)
+
+        assert shared_cache.get(get_url, max_age=3600, variant=get_variant) == expected
+
+    @pytest.mark.parametrize("cache_format", ["json", "msgpack"])
+    def test_set_and_get_in_each_format(self, cache_dir: Path, cache_format: str) -> None:
+        """Test that entries round-trip in both on-disk encodings."""
+        if cache_format == "msgpack":
+            pytest.importorskip("ormsgpack")
+        cache = CacheManager(cache_dir, entry_format=cache_format)  # type: ignore[arg-type]
         url = "https://example.com/page"
         response = {"success": True, "data": {"markdown": "# Test"}}
 
-        cache_manager.set(url, response, max_age=3600)
-        cached = cache_manager.get(url, max_age=3600)
+        cache.set(url, response, max_age=3600, content_hash="abc")
 
-        assert cached is not None
-        assert cached["success"] is True
-        assert cached["data"]["markdown"] == "# Test"
+        raw = (cache_dir / "pages" / f"{cache._cache_key(url)}.json").read_bytes()
+        assert (raw[:1] == b"{") is (cache_format == "json")
+        assert cache.get(url, max_age=3600) == response
+        previous = cache.get_previous(url)
+        assert previous is not None
+        assert previous.content_hash == "abc"
 
-    def test_get_returns_none_when_not_cached(self, cache_manager: CacheManager) -> None:
-        """Test that get returns None for uncached URLs."""
-        url = "https://example.com/uncached"
-        cached = cache_manager.get(url, max_age=3600)
+    def test_reads_entries_written_in_other_format(self, cache_dir: Path) -> None:
+        """Test that switching format keeps existing entries readable both ways."""
+        pytest.importorskip("ormsgpack")
+        CacheManager(cache_dir).set("https://example.com/json", {"format": "json"}, max_age=3600)
+        msgpack_cache = CacheManager(cache_dir, entry_format="msgpack")
+        msgpack_cache.set("https://example.com/msgpack", {"format": "msgpack"}, max_age=3600)
 
-        assert cached is None
+        json_cache = CacheManager(cache_dir)
+        assert msgpack_cache.get("https://example.com/json", max_age=3600) == {"format": "json"}
+        assert json_cache.get("https://example.com/msgpack", max_age=3600) == {"format": "msgpack"}
+        assert json_cache.stats()["valid"] == 2
+
+    def test_rejects_unknown_format(self, cache_dir: Path) -> None:
+        """Test that an unsupported format fails fast."""
+        with pytest.raises(ValidationError):
+            CacheManager(cache_dir, entry_format="xml")  # type: ignore[arg-type]
 
     def test_get_returns_none_when_expired(self, cache_manager: CacheManager, cache_dir: Path) -> None:
         """Test that get returns None for expired entries."""
@@ -83,13 +173,14 @@ class TestCacheManager:
         cache_file = cache_dir / "pages" / f"{cache_key}.json"
 
         # Create an expired entry
-        now = datetime.now(timezone.utc)
-        expired_at = datetime.fromtimestamp(now.timestamp() - 3600, tz=timezone.utc)  # 1 hour ago
+        now = time.time()
+        expired_epoch = int(now) - 3600  # 1 hour ago
 
         entry = CacheEntry(
             url=url,
-            cached_at=now.isoformat(),
-            expires_at=expired_at.isoformat(),
+            cached_at=datetime.fromtimestamp(now, tz=timezone.utc).isoformat(),
+            expires_at=datetime.fromtimestamp(expired_epoch, tz=timezone.utc).isoformat(),
+            expires_epoch=expired_epoch,
             response={"success": True},
         )
         cache_file.write_text(entry.model_dump_json())
@@ -98,6 +189,21 @@ class TestCacheManager:
 
         assert cached is None
 
+    def test_get_honours_legacy_iso_only_expiry(self, cache_manager: CacheManager, cache_dir: Path) -> None:
+        """Test that entries written before expires_epoch existed still expire correctly."""
+        now = datetime.now(timezone.utc)
+        for url, offset in (("https://example.com/stale", -3600), ("https://example.com/fresh", 3600)):
+            entry = CacheEntry(
+                url=url,
+                cached_at=now.isoformat(),
+                expires_at=datetime.fromtimestamp(now.timestamp() + offset, tz=timezone.utc).isoformat(),
+                response={"url": url},
+            )
+            (cache_dir / "pages" / f"{cache_manager._cache_key(url)}.json").write_text(entry.model_dump_json())
+
+        assert cache_manager.get("https://example.com/stale", max_age=3600) is None
+        assert cache_manager.get("https://example.com/fresh", max_age=3600) == {"url": "https://example.com/fresh"}
+
     def test_get_returns_none_when_max_age_zero(self, cache_manager: CacheManager) -> None:
         """Test that get returns None when max_age is 0."""
         url = "https://example.com/page"
@@ -119,6 +225,19 @@ class TestCacheManager:
         cache_files = list((cache_dir / "pages").glob("*.json"))
         assert len(cache_files) == 0
 
+    def test_set_replaces_entry_with_smaller_response(self, cache_manager: CacheManager) -> None:
+        """Test that a smaller re-fetch replaces the cached copy, so a page that shrank is not served stale."""
+        url = "https://example.com/page"
+        cache_manager.set(
+            url, {"data": {"markdown": "# Full page\n\n" + "content " * 200}}, max_age=60, content_hash="a"
+        )
+        cache_manager.set(url, {"data": {"markdown": "# Short"}}, max_age=3600, content_hash="b")
+
+        assert cache_manager.get(url, max_age=3600) == {"data": {"markdown": "# Short"}}
+        previous = cache_manager.get_previous(url)
+        assert previous is not None
+        assert previous.content_hash == "b"
+
     def test_clear_specific_url(self, cache_manager: CacheManager) -> None:
         """Test clearing cache for a specific URL."""
         url1 = "https://example.com/page1"
@@ -167,13 +286,14 @@ class TestCacheManager:
         cache_key = cache_manager._cache_key(url)
         cache_file = cache_dir / "pages" / f"{cache_key}.json"
 
-        now = datetime.now(timezone.utc)
-        expired_at = datetime.fromtimestamp(now.timestamp() - 3600, tz=timezone.utc)
+        now = time.time()
+        expired_epoch = int(now) - 3600
 
         entry = CacheEntry(
             url=url,
-            cached_at=now.isoformat(),
-            expires_at=expired_at.isoformat(),
+            cached_at=datetime.fromtimestamp(now, tz=timezone.utc).isoformat(),
+            expires_at=datetime.fromtimestamp(expired_epoch, tz=timezone.utc).isoformat(),
+            expires_epoch=expired_epoch,
             response={"expired": True},
         )
         cache_file.write_text(entry.model_dump_json())
@@ -184,6 +304,44 @@ class TestCacheManager:
         assert not cache_file.exists()
         assert cache_manager.get("https://example.com/valid", max_age=3600) is not None
 
+    def test_prune_uses_stamped_expiry_without_reading_files(
+        self, cache_manager: CacheManager, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that entries written by set() are pruned from mtime alone."""
+        cache_manager.set("https://example.com/short", {"ttl": 60}, max_age=60)
+        cache_manager.set("https://example.com/long", {"ttl": 7200}, max_age=7200)
+        cache_manager._flush_index()
+
+        def fail_read(path: str) -> None:
+            raise AssertionError(f"unexpected read of {path}")
+
+        monkeypatch.setattr(cache_manager, "_read_entry", fail_read)
+        monkeypatch.setattr("supacrawl.cache.time.time", lambda: time.time_ns() / 1e9 + 600)
+
+        assert cache_manager.stats()["expired"] == 1
+        assert cache_manager.prune_expired() == 1
+        assert cache_manager.stats()["entries"] == 1
+        assert cache_manager._normalise_url("https://example.com/short") not in cache_manager._load_index()
+
+    def test_prune_skips_unreadable_entries(self, cache_manager: CacheManager, cache_dir: Path) -> None:
+        """Test that prune leaves corrupt files in place and still prunes the rest."""
+        corrupt = cache_dir / "pages" / "corrupt.json"
+        corrupt.write_text("{not json")
+
+        url = "https://example.com/expired"
+        now = datetime.now(timezone.utc)
+        entry = CacheEntry(
+            url=url,
+            cached_at=now.isoformat(),
+            expires_at=datetime.fromtimestamp(now.timestamp() - 3600, tz=timezone.utc).isoformat(),
+            response={"expired": True},
+        )
+        (cache_dir / "pages" / f"{cache_manager._cache_key(url)}.json").write_text(entry.model_dump_json())
+
+        assert cache_manager.prune_expired() == 1
+        assert corrupt.exists()
+        assert cache_manager.stats()["entries"] == 1
+
     def test_format_size(self) -> None:
         """Test size formatting."""
         assert CacheManager._format_size(0) == "0.0 B"
@@ -191,11 +349,15 @@ class TestCacheManager:
         assert CacheManager._format_size(1024) == "1.0 KB"
         assert CacheManager._format_size(1024 * 1024) == "1.0 MB"
         assert CacheManager._format_size(1024 * 1024 * 1024) == "1.0 GB"
+        assert CacheManager._format_size(1023) == "1023.0 B"
+        assert CacheManager._format_size(1536) == "1.5 KB"
+        assert CacheManager._format_size(1024**5) == "1024.0 TB"
 
     def test_index_updated_on_set(self, cache_manager: CacheManager, cache_dir: Path) -> None:
         """Test that index is updated when setting cache."""
         url = "https://example.com/page"
         cache_manager.set(url, {"success": True}, max_age=3600)
+        cache_manager._flush_index()
 
         index_file = cache_dir / "index.json"
         assert index_file.exists()
@@ -204,14 +366,64 @@ class TestCacheManager:
         normalised_url = cache_manager._normalise_url(url)
         assert normalised_url in index
 
-    def test_variant_produces_different_cache_keys(self, cache_manager: CacheManager) -> None:
+    def test_index_written_back_in_batches(
+        self, cache_manager: CacheManager, cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that set() defers index writes until enough mutations accumulate."""
+        monkeypatch.setattr("supacrawl.cache._INDEX_FLUSH_EVERY", 3)
+        index_file = cache_dir / "index.json"
+
+        cache_manager.set("https://example.com/1", {"page": 1}, max_age=3600)
+        cache_manager.set("https://example.com/2", {"page": 2}, max_age=3600)
+        assert not index_file.exists()
+
+        cache_manager.set("https://example.com/3", {"page": 3}, max_age=3600)
+        assert len(json.loads(index_file.read_text())) == 3
+
+    def test_close_and_collection_flush_the_index(self, cache_dir: Path) -> None:
+        """Test that pending index entries reach disk on close() and when a manager is collected."""
+        index_file = cache_dir / "index.json"
+        closed = CacheManager(cache_dir)
+        closed.set("https://example.com/closed", {"page": 1}, max_age=3600)
+        closed.close()
+        assert len(json.loads(index_file.read_text())) == 1
+
+        collected = CacheManager(cache_dir)
+        collected.set("https://example.com/collected", {"page": 2}, max_age=3600)
+        del collected
+        gc.collect()
+        assert len(json.loads(index_file.read_text())) == 2
+
+    def test_managers_sharing_a_directory_merge_their_index_entries(self, cache_dir: Path) -> None:
+        """Test that a flush merges into index.json rather than overwriting another manager's entries."""
+        first = CacheManager(cache_dir)
+        second = CacheManager(cache_dir)
+        first.set("https://example.com/a", {"page": "a"}, max_age=3600)
+        second.set("https://example.com/b", {"page": "b"}, max_age=3600)
+        first.close()
+        second.close()
+
+        index = json.loads((cache_dir / "index.json").read_text())
+        assert set(index) == {
+            first._normalise_url("https://example.com/a"),
+            first._normalise_url("https://example.com/b"),
+        }
+
+    def test_variant_produces_different_cache_keys(self, readonly_cache: CacheManager) -> None:
         """Test that different variants produce different cache keys."""
         url = "https://example.com/page"
-        key_default = cache_manager._cache_key(url)
-        key_variant = cache_manager._cache_key(url, variant="screenshot_full_page=False")
+        key_default = readonly_cache._cache_key(url)
+        key_variant = readonly_cache._cache_key(url, variant="screenshot_full_page=False")
 
         assert key_default != key_variant
 
+    def test_variant_delimiter_avoids_collision(self, readonly_cache: CacheManager) -> None:
+        """Test that a URL containing the variant separator cannot alias a variant key."""
+        key_in_url = readonly_cache._cache_key("https://example.com/page|device=iPhone 14")
+        key_variant = readonly_cache._cache_key("https://example.com/page", variant="device=iPhone 14")
+
+        assert key_in_url != key_variant
+
     def test_variant_cache_entries_are_independent(self, cache_manager: CacheManager) -> None:
         """Test that variant and non-variant cache entries don't collide."""
         url = "https://example.com/page"
@@ -228,26 +440,3 @@ class TestCacheManager:
         assert cached_variant is not None
         assert cached_default["screenshot"] == "full_page_b64"
         assert cached_variant["screenshot"] == "viewport_only_b64"
-
-    def test_variant_none_matches_no_variant(self, cache_manager: CacheManager) -> None:
-        """Test that variant=None is equivalent to no variant."""
-        url = "https://example.com/page"
-        cache_manager.set(url, {"data": "test"}, max_age=3600)
-
-        cached = cache_manager.get(url, max_age=3600, variant=None)
-
-        assert cached is not None
-        assert cached["data"] == "test"
-
-    def test_url_with_different_tracking_params_use_same_cache(self, cache_manager: CacheManager) -> None:
-        """Test that URLs with different tracking params use same cache."""
-        base_url = "https://example.com/page"
-        url_with_utm = "https://example.com/page?utm_source=google"
-
-        cache_manager.set(base_url, {"cached": True}, max_age=3600)
-
-        # Should get the same cache entry
-        cached = cache_manager.get(url_with_utm, max_age=3600)
-
-        assert cached is not None
-        assert cached["cached"] is True
@@ -1,10 +1,148 @@
-"""E2E tests for CLI commands."""
+"""Tests for the map, scrape and crawl CLI commands.
+
+The ``e2e`` classes drive the installed CLI in a subprocess against the live
+network. ``TestCliCommandsOffline`` replays the same command surface in-process
+with the service layer patched to return canned results, so the CLI's argument
+handling and output contract are covered on every run without network access.
+"""
 
 import json
 import subprocess
+from collections.abc import AsyncIterator
 from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from click.testing import CliRunner
+
+from supacrawl.cli._common import app
+from supacrawl.models import (
+    CrawlEvent,
+    MapEvent,
+    MapLink,
+    MapResult,
+    ScrapeData,
+    ScrapeMetadata,
+    ScrapeResult,
+)
+
+_EXAMPLE_MARKDOWN = (
+    "# Example Domain\n\n"
+    "This domain is for use in illustrative examples in documents. You may use this domain "
+    "in literature without prior coordination or asking for permission.\n\n"
+    "[More information...](https://www.iana.org/domains/example)"
+)
+
+
+def _example_scrape_result() -> ScrapeResult:
+    """A successful scrape of example.com, as the live E2E test observes it."""
+    return ScrapeResult(
+        success=True,
+        data=ScrapeData(
+            markdown=_EXAMPLE_MARKDOWN,
+            metadata=ScrapeMetadata(title="Example Domain", source_url="https://example.com"),
+        ),
+    )
+
+
+def _events(*events: Any) -> Any:
+    """Build a side_effect returning a fresh async generator over *events* per call."""
+
+    async def gen(*_args: Any, **_kwargs: Any) -> AsyncIterator[Any]:
+        for event in events:
+            yield event
+
+    return gen
+
+
+class TestCliCommandsOffline:
+    """In-process CLI tests with the service layer patched (no network, no browser)."""
+
+    def test_map_prints_urls(self) -> None:
+        """Text output lists one discovered URL per line."""
+        result = MapResult(
+            success=True,
+            links=[MapLink(url="https://example.com/"), MapLink(url="https://example.com/about")],
+        )
+        service = MagicMock()
+        service.map = _events(MapEvent(type="complete", discovered=2, result=result))
+
+        with patch("supacrawl.services.map.MapService", return_value=service):
+            out = CliRunner().invoke(app, ["map", "https://example.com", "--limit", "5"])
+
+        assert out.exit_code == 0, out.output
+        assert out.stdout.splitlines() == ["https://example.com/", "https://example.com/about"]
+
+    def test_map_json_output(self, tmp_path: Path) -> None:
+        """JSON output is a serialised MapResult written to the --output file."""
+        result = MapResult(success=True, links=[MapLink(url="https://example.com/")])
+        service = MagicMock()
+        service.map = _events(MapEvent(type="complete", discovered=1, result=result))
+        output_file = tmp_path / "map.json"
+
+        with patch("supacrawl.services.map.MapService", return_value=service):
+            out = CliRunner().invoke(
+                app, ["map", "https://example.com", "--format", "json", "--output", str(output_file)]
+            )
+
+        assert out.exit_code == 0, out.output
+        data = json.loads(output_file.read_text(encoding="utf-8"))
+        assert data == {"success": True, "links": [{"url": "https://example.com/"}]}
+
+    def test_scrape_prints_markdown(self) -> None:
+        """Markdown goes to stdout."""
+        service = MagicMock()
+        service.scrape = AsyncMock(return_value=_example_scrape_result())
+
+        with patch("supacrawl.services.scrape.ScrapeService", return_value=service):
+            out = CliRunner().invoke(app, ["scrape", "https://example.com"])
+
+        assert out.exit_code == 0, out.output
+        assert out.stdout.strip() == _EXAMPLE_MARKDOWN
+        assert service.scrape.await_args.kwargs["url"] == "https://example.com"
+
+    def test_scrape_writes_markdown_with_frontmatter(self, tmp_path: Path) -> None:
+        """--output writes frontmatter followed by the markdown body."""
+        service = MagicMock()
+        service.scrape = AsyncMock(return_value=_example_scrape_result())
+        output_file = tmp_path / "page.md"
+
+        with patch("supacrawl.services.scrape.ScrapeService", return_value=service):
+            out = CliRunner().invoke(app, ["scrape", "https://example.com", "--output", str(output_file)])
+
+        assert out.exit_code == 0, out.output
+        content = output_file.read_text(encoding="utf-8")
+        assert content.startswith("---")
+        assert content.endswith(_EXAMPLE_MARKDOWN)
+
+    def test_scrape_failure_exits_non_zero(self) -> None:
+        """A failed scrape reports the error on stderr and exits 1."""
+        service = MagicMock()
+        service.scrape = AsyncMock(return_value=ScrapeResult(success=False, error="boom"))
+
+        with patch("supacrawl.services.scrape.ScrapeService", return_value=service):
+            out = CliRunner().invoke(app, ["scrape", "https://example.com"])
+
+        assert out.exit_code == 1
+        assert "Error: boom" in out.stderr
+
+    def test_crawl_reports_pages_and_completion(self, tmp_path: Path) -> None:
+        """Crawl echoes each page path and the completion summary."""
+        service = MagicMock()
+        service.crawl = _events(
+            CrawlEvent(type="page", url="https://example.com/", completed=1, total=2),
+            CrawlEvent(type="page", url="https://example.com/about", completed=2, total=2),
+            CrawlEvent(type="complete", completed=2, total=2),
+        )
+
+        with patch("supacrawl.services.crawl.CrawlService", return_value=service):
+            out = CliRunner().invoke(app, ["crawl", "https://example.com", "--output", str(tmp_path / "corpus")])
+
+        assert out.exit_code == 0, out.output
+        assert "+ /" in out.stdout
+        assert "+ /about" in out.stdout
+        assert "Complete: 2/2 pages" in out.stderr
 
 
 @pytest.mark.e2e
@@ -1,13 +1,21 @@
 """Tests for markdown converter."""
 
+import pytest
 from bs4 import BeautifulSoup, Tag
+from conftest import missing_substrings
 
 from supacrawl.services.converter import (
+    _QUICK_SITE_RE,
     SITE_PREPROCESSORS,
+    SITE_PREPROCESSORS_BY_NAME,
     MarkdownConverter,
+    NodeIndex,
+    SitePreprocessor,
     _detect_css_counter_lists,
     _detect_mkdocs_material,
     _detect_wordpress,
+    _get_list_level,
+    _nest_levels,
     _preprocess_css_counter_lists,
     _preprocess_mkdocs_material,
     _preprocess_wordpress,
@@ -15,59 +23,101 @@ from supacrawl.services.converter import (
 )
 
 
-class TestMarkdownConverter:
-    """Tests for MarkdownConverter."""
-
-    def test_converts_headings_to_atx(self):
-        """Test that headings use ATX style (#)."""
-        converter = MarkdownConverter()
-        html = "<h1>Title</h1><h2>Subtitle</h2>"
-        md = converter.convert(html, only_main_content=False)
-        assert "# Title" in md
-        assert "## Subtitle" in md
+def _direct_li(ol: Tag) -> list[Tag]:
+    """Return the <li> children of a list, by slicing its contents rather than searching."""
+    return [child for child in ol.contents if isinstance(child, Tag) and child.name == "li"]
+
+
+# (html, expected substrings, forbidden substrings, convert() kwargs) for the basic conversion rules.
+CONVERTER_CASES = [
+    pytest.param(
+        "<h1>Title</h1><h2>Subtitle</h2>",
+        ["# Title", "## Subtitle"],
+        [],
+        {"only_main_content": False},
+        id="headings-atx",
+    ),
+    pytest.param(
+        "<p>Content</p><script>alert('x')</script>",
+        ["Content"],
+        ["alert"],
+        {"only_main_content": False},
+        id="removes-script",
+    ),
+    pytest.param(
+        '<a href="https://example.com">Link</a>',
+        ["[Link](https://example.com)"],
+        [],
+        {"only_main_content": False},
+        id="preserves-links",
+    ),
+    pytest.param(
+        "<pre><code>def foo(): pass</code></pre>",
+        ["def foo(): pass"],
+        [],
+        {"only_main_content": False},
+        id="preserves-code-blocks",
+    ),
+    pytest.param(
+        "<ul><li>Item 1</li><li>Item 2</li></ul>",
+        ["- Item 1", "- Item 2"],
+        [],
+        {"only_main_content": False},
+        id="dash-bullets",
+    ),
+    pytest.param(
+        "<table><tr><th>Header</th></tr><tr><td>Data</td></tr></table>",
+        ["Header", "Data"],
+        [],
+        {"only_main_content": False},
+        id="preserves-tables",
+    ),
+]
 
-    def test_removes_script_tags(self):
-        """Test that script tags are removed."""
-        converter = MarkdownConverter()
-        html = "<p>Content</p><script>alert('x')</script>"
-        md = converter.convert(html, only_main_content=False)
-        assert "alert" not in md
-        assert "Content" in md
 
-    def test_preserves_links(self):
-        """Test that links are preserved."""
-        converter = MarkdownConverter()
-        html = '<a href="https://example.com">Link</a>'
-        md = converter.convert(html, only_main_content=False)
-        assert "[Link](https://example.com)" in md
+class TestMarkdownConverter:
+    """Tests for MarkdownConverter."""
 
-    def test_strips_javascript_links(self):
+    @pytest.mark.parametrize(("html", "expected", "forbidden", "kwargs"), CONVERTER_CASES)
+    def test_convert_case(self, converter, html, expected, forbidden, kwargs):
+        """Test a basic conversion rule: expected substrings present, forbidden ones absent."""
+        md = converter.convert(html, **kwargs)
+        assert missing_substrings(md, *expected) == []
+        assert [s for s in forbidden if s in md] == []
+
+    def test_base_url_does_not_leak_between_calls(self, converter):
+        """Test that the reused markdownify instance takes each call's base_url."""
+        html = '<a href="/docs">Docs</a>'
+        first = converter.convert(html, base_url="https://a.example", only_main_content=False)
+        second = converter.convert(html, base_url="https://b.example", only_main_content=False)
+        relative = converter.convert(html, only_main_content=False)
+        assert "[Docs](https://a.example/docs)" in first
+        assert "[Docs](https://b.example/docs)" in second
+        assert "[Docs](/docs)" in relative
+
+    def test_strips_javascript_links(self, converter):
         """Test that javascript: links are removed entirely (UI controls)."""
-        converter = MarkdownConverter()
         html = '<a href="javascript:window.print()">Print this page</a>'
         md = converter.convert(html, only_main_content=False)
         assert md.strip() == ""
         assert "Print this page" not in md
         assert "javascript:" not in md
 
-    def test_strips_javascript_void_links(self):
+    def test_strips_javascript_void_links(self, converter):
         """Test that javascript:void(0) links are removed entirely."""
-        converter = MarkdownConverter()
         html = '<a href="javascript:void(0)">Click me</a>'
         md = converter.convert(html, only_main_content=False)
         assert md.strip() == ""
         assert "Click me" not in md
 
-    def test_preserves_non_javascript_protocols(self):
+    def test_preserves_non_javascript_protocols(self, converter):
         """Test that other protocols like mailto: are preserved."""
-        converter = MarkdownConverter()
         html = '<a href="mailto:test@example.com">Email</a>'
         md = converter.convert(html, only_main_content=False)
         assert "[Email](mailto:test@example.com)" in md
 
-    def test_strips_javascript_case_insensitive(self):
+    def test_strips_javascript_case_insensitive(self, converter):
         """Test that javascript: links are removed regardless of case."""
-        converter = MarkdownConverter()
         # Uppercase
         html1 = '<a href="JAVASCRIPT:alert(1)">Uppercase</a>'
         md1 = converter.convert(html1, only_main_content=False)
@@ -80,48 +130,52 @@ class TestMarkdownConverter:
         assert md2.strip() == ""
         assert "Mixed" not in md2
 
-    def test_strips_javascript_with_whitespace(self):
+    def test_strips_javascript_with_whitespace(self, converter):
         """Test that javascript: links with leading/trailing whitespace are removed."""
-        converter = MarkdownConverter()
         html = '<a href=" javascript:void(0) ">Whitespace</a>'
         md = converter.convert(html, only_main_content=False)
         assert md.strip() == ""
         assert "Whitespace" not in md
 
-    def test_preserves_code_blocks(self):
-        """Test that code blocks are preserved."""
-        converter = MarkdownConverter()
-        html = "<pre><code>def foo(): pass</code></pre>"
+    @pytest.mark.parametrize(
+        "href",
+        ["javascript:", "  JavaScript:", "\tJAVASCRIPT:void(0)", "vbscript:msgbox"],
+    )
+    def test_strips_script_protocol_variants(self, converter, href):
+        """Test that script pseudo-protocols are stripped however browsers would still run them."""
+        html = f'<a href="{href}">Run</a>'
+        md = converter.convert(html, only_main_content=False)
+        assert "Run" not in md
+
+    def test_preserves_links_mentioning_javascript(self, converter):
+        """Test that only a leading script protocol is stripped, not the word anywhere in the URL."""
+        html = '<a href="https://example.com/javascript:guide">Guide</a>'
         md = converter.convert(html, only_main_content=False)
-        assert "def foo(): pass" in md
+        assert "[Guide](https://example.com/javascript:guide)" in md
 
-    def test_cleans_whitespace(self):
+    def test_cleans_whitespace(self, converter):
         """Test that excessive whitespace is cleaned."""
-        converter = MarkdownConverter()
         html = "<p>A</p><p></p><p></p><p></p><p>B</p>"
         md = converter.convert(html, only_main_content=False)
         # Should not have more than 2 consecutive blank lines
         assert "\n\n\n\n" not in md
 
-    def test_removes_nav_tags(self):
+    def test_removes_nav_tags(self, converter):
         """Test that nav tags are removed."""
-        converter = MarkdownConverter()
         html = "<nav>Navigation</nav><p>Content</p>"
         md = converter.convert(html, only_main_content=False)
         assert "Navigation" not in md
         assert "Content" in md
 
-    def test_removes_footer_tags(self):
+    def test_removes_footer_tags(self, converter):
         """Test that footer tags are removed."""
-        converter = MarkdownConverter()
         html = "<p>Content</p><footer>Footer text</footer>"
         md = converter.convert(html, only_main_content=False)
         assert "Footer text" not in md
         assert "Content" in md
 
-    def test_finds_main_content_with_main_tag(self):
+    def test_finds_main_content_with_main_tag(self, converter):
         """Test that main content is extracted from main tag."""
-        converter = MarkdownConverter()
         html = """
         <nav>Navigation</nav>
         <main><h1>Main Content</h1></main>
@@ -134,9 +188,8 @@ class TestMarkdownConverter:
         assert "Navigation" not in md
         assert "Footer" not in md
 
-    def test_finds_main_content_with_article_tag(self):
+    def test_finds_main_content_with_article_tag(self, converter):
         """Test that main content is extracted from article tag."""
-        converter = MarkdownConverter()
         html = """
         <div class="sidebar">Sidebar</div>
         <article><h1>Article Content</h1></article>
@@ -145,60 +198,56 @@ class TestMarkdownConverter:
         assert "Article Content" in md
         assert "Sidebar" not in md
 
-    def test_falls_back_to_body_when_no_main_content(self):
+    def test_falls_back_to_body_when_no_main_content(self, converter):
         """Test fallback to body when no main content selector matches."""
-        converter = MarkdownConverter()
         html = "<body><div><h1>Content</h1></div></body>"
         md = converter.convert(html, only_main_content=True)
         assert "Content" in md
 
-    def test_handles_empty_html(self):
+    def test_handles_empty_html(self, converter):
         """Test handling of empty HTML."""
-        converter = MarkdownConverter()
         assert converter.convert("") == ""
         assert converter.convert("   ") == ""
 
-    def test_handles_malformed_html(self):
+    def test_converts_the_cleaned_tree_without_reparsing(self, monkeypatch):
+        """Test that markdownify walks the preprocessed soup instead of parsing its serialisation."""
+
+        def fail_parse(*args, **kwargs):
+            raise AssertionError("markdownify must not parse HTML again")
+
+        monkeypatch.setattr("markdownify.BeautifulSoup", fail_parse)
+        converter = MarkdownConverter(cache_size=0)
+        md = converter.convert("<main><h1>Title</h1><p>Body &lt;b&gt; text</p></main>")
+        assert missing_substrings(md, "# Title", "Body <b> text") == []
+
+    def test_blank_html_skips_parsing(self, monkeypatch):
+        """Test that empty and whitespace-only HTML return before any soup is built."""
+
+        def fail_parse(html):
+            raise AssertionError("blank HTML must not be parsed")
+
+        monkeypatch.setattr("supacrawl.services.converter.make_soup", fail_parse)
+        converter = MarkdownConverter(cache_size=0)
+        for html in ("", "   ", "\n\t \r\n", "\u00a0\u2028"):
+            assert converter.convert(html) == ""
+
+    def test_handles_malformed_html(self, converter):
         """Test handling of malformed HTML."""
-        converter = MarkdownConverter()
         html = "<p>Unclosed paragraph<div>Nested weirdly"
         md = converter.convert(html, only_main_content=False)
         # Should still extract some text
         assert "Unclosed paragraph" in md
 
-    def test_uses_dash_for_bullets(self):
-        """Test that unordered lists use dash bullets."""
-        converter = MarkdownConverter()
-        html = "<ul><li>Item 1</li><li>Item 2</li></ul>"
-        md = converter.convert(html, only_main_content=False)
-        assert "- Item 1" in md
-        assert "- Item 2" in md
-
-    def test_preserves_tables(self):
-        """Test that tables are preserved."""
-        converter = MarkdownConverter()
-        html = """
-        <table>
-            <tr><th>Header</th></tr>
-            <tr><td>Data</td></tr>
-        </table>
-        """
-        md = converter.convert(html, only_main_content=False)
-        assert "Header" in md
-        assert "Data" in md
-
-    def test_strips_trailing_whitespace_per_line(self):
+    def test_strips_trailing_whitespace_per_line(self, converter):
         """Test that trailing whitespace is stripped from each line."""
-        converter = MarkdownConverter()
         html = "<p>Line 1</p><p>Line 2</p>"
         md = converter.convert(html, only_main_content=False)
         lines = md.split("\n")
         for line in lines:
             assert line == line.rstrip()
 
-    def test_no_boilerplate_removal(self):
+    def test_no_boilerplate_removal(self, converter):
         """Test conversion with boilerplate removal disabled."""
-        converter = MarkdownConverter()
         html = "<nav>Navigation</nav><p>Content</p>"
         md = converter.convert(html, only_main_content=False, remove_boilerplate=False)
         # When remove_boilerplate=False, markdownify still strips nav in its strip list
@@ -206,12 +255,44 @@ class TestMarkdownConverter:
         assert "Content" in md
 
 
+class TestConvertCache:
+    """Tests for MarkdownConverter's per-instance result cache."""
+
+    def test_repeated_input_returns_cached_result(self, converter):
+        """Test that identical input and options reuse the first conversion."""
+        html = "<main><h1>Cached</h1><p>Body</p></main>"
+        first = converter.convert(html)
+        assert converter.convert(html) is first
+
+    def test_options_are_part_of_the_key(self, converter):
+        """Test that the same HTML with different options is converted separately."""
+        html = '<div><p class="keep">Kept</p><p class="drop">Dropped</p></div>'
+        full = converter.convert(html, only_main_content=False)
+        filtered = converter.convert(html, only_main_content=False, exclude_tags=[".drop"])
+        assert "Dropped" in full
+        assert "Dropped" not in filtered
+
+    def test_cache_is_bounded(self):
+        """Test that the oldest entry is evicted once the cache is full."""
+        converter = MarkdownConverter(cache_size=2)
+        first = converter.convert("<p>one</p>", only_main_content=False)
+        converter.convert("<p>two</p>", only_main_content=False)
+        converter.convert("<p>three</p>", only_main_content=False)
+        assert len(converter._cache) == 2
+        assert converter.convert("<p>one</p>", only_main_content=False) is not first
+
+    def test_cache_disabled_with_zero_size(self):
+        """Test that cache_size=0 converts every call afresh."""
+        converter = MarkdownConverter(cache_size=0)
+        converter.convert("<p>one</p>", only_main_content=False)
+        assert not converter._cache
+
+
 class TestIncludeExcludeTags:
     """Tests for include_tags and exclude_tags filtering."""
 
-    def test_include_tags_extracts_matching_elements(self):
+    def test_include_tags_extracts_matching_elements(self, converter):
         """Test that include_tags extracts only matching elements."""
-        converter = MarkdownConverter()
         html = """
         <nav>Navigation</nav>
         <article><h1>Article Content</h1></article>
@@ -227,9 +308,8 @@ class TestIncludeExcludeTags:
         # Sidebar should not be included (not matching include_tags)
         assert "Sidebar" not in md
 
-    def test_include_tags_with_class_selector(self):
+    def test_include_tags_with_class_selector(self, converter):
         """Test that include_tags works with class selectors."""
-        converter = MarkdownConverter()
         html = """
         <div class="header">Header</div>
         <div class="post-content"><p>Post text</p></div>
@@ -245,9 +325,8 @@ class TestIncludeExcludeTags:
         assert "Header" not in md
         assert "Footer" not in md
 
-    def test_include_tags_multiple_selectors(self):
+    def test_include_tags_multiple_selectors(self, converter):
         """Test that multiple include_tags selectors are combined."""
-        converter = MarkdownConverter()
         html = """
         <nav>Navigation</nav>
         <article><h1>Article</h1></article>
@@ -265,9 +344,8 @@ class TestIncludeExcludeTags:
         assert "Navigation" not in md
         assert "Footer" not in md
 
-    def test_exclude_tags_removes_matching_elements(self):
+    def test_exclude_tags_removes_matching_elements(self, converter):
         """Test that exclude_tags removes matching elements."""
-        converter = MarkdownConverter()
         html = """
         <article>
             <h1>Title</h1>
@@ -285,9 +363,8 @@ class TestIncludeExcludeTags:
         assert "Content" in md
         assert "Ad here" not in md
 
-    def test_exclude_tags_multiple_selectors(self):
+    def test_exclude_tags_multiple_selectors(self, converter):
         """Test that multiple exclude_tags selectors are removed."""
-        converter = MarkdownConverter()
         html = """
         <article>
             <h1>Title</h1>
@@ -309,9 +386,8 @@ class TestIncludeExcludeTags:
         assert "Sidebar" not in md
         assert "Footer text" not in md
 
-    def test_exclude_before_include(self):
+    def test_exclude_before_include(self, converter):
         """Test that exclude_tags is applied before include_tags."""
-        converter = MarkdownConverter()
         html = """
         <article>
             <h1>Article Title</h1>
@@ -331,9 +407,33 @@ class TestIncludeExcludeTags:
         assert "Good content" in md
         assert "Promotion" not in md
 
-    def test_include_tags_takes_precedence_over_only_main_content(self):
+    def test_fused_exclude_include_matches_separate_passes(self, converter, make_soup):
+        """Test that the single-walk exclude+include path matches running each pass in turn."""
+        html = """
+        <article>
+            <h1>Article Title</h1>
+            <p>First</p>
+            <div class="promo"><p>Promoted</p></div>
+            <p>Second</p>
+        </article>
+        <aside><p>Aside</p></aside>
+        """
+        for exclude_tags, include_tags in [
+            ([".promo"], ["p", "h1"]),
+            ([".promo", "aside"], ["article > p"]),
+            (["p:first-child"], ["p"]),  # sibling-sensitive exclude takes the two-pass fallback
+            ([".promo"], ["p:last-child"]),  # lookahead include takes the two-pass fallback
+        ]:
+            fused = make_soup(html)
+            fused_wrapper = converter._apply_exclude_and_include_tags(fused, exclude_tags, include_tags)
+            separate = make_soup(html)
+            converter._apply_exclude_tags(separate, exclude_tags)
+            separate_wrapper = converter._apply_include_tags(separate, include_tags)
+            assert str(fused_wrapper) == str(separate_wrapper)
+            assert str(fused) == str(separate)
+
+    def test_include_tags_takes_precedence_over_only_main_content(self, converter):
         """Test that include_tags takes precedence over only_main_content."""
-        converter = MarkdownConverter()
         html = """
         <main><p>Main area</p></main>
         <aside class="special"><p>Special sidebar</p></aside>
@@ -349,9 +449,8 @@ class TestIncludeExcludeTags:
         # Main should not be included since include_tags overrides only_main_content
         assert "Main area" not in md
 
-    def test_invalid_selector_logs_warning_but_continues(self):
+    def test_invalid_selector_logs_warning_but_continues(self, converter):
         """Test that invalid selectors don't crash, just log warning."""
-        converter = MarkdownConverter()
         html = "<p>Content</p>"
         # Invalid CSS selector should not crash
         md = converter.convert(
@@ -363,9 +462,35 @@ class TestIncludeExcludeTags:
         # Content should still be extracted
         assert "Content" in md
 
-    def test_no_matching_include_tags_returns_full_content(self):
+    def test_invalid_selector_does_not_drop_other_excludes(self, converter):
+        """Test that one invalid selector is skipped without disabling the rest of the union."""
+        html = "<p>Content</p><div class='ad'>Ad</div><aside>Aside</aside>"
+        md = converter.convert(
+            html,
+            only_main_content=False,
+            remove_boilerplate=False,
+            exclude_tags=[".ad", "[invalid[selector", "aside"],
+        )
+        assert "Content" in md
+        assert "Ad" not in md
+        assert "Aside" not in md
+
+    def test_invalid_selector_warns_on_every_call(self, converter, caplog):
+        """Test that caching a selector's compile failure does not silence later warnings."""
+        for page in ("One", "Two"):
+            converter.convert(f"<p>{page}</p>", only_main_content=False, include_tags=["[invalid[selector"])
+        warnings = [r for r in caplog.records if "Invalid include_tags selector" in r.getMessage()]
+        assert len(warnings) == 2
+
+    def test_include_tags_keeps_identical_elements(self, converter):
+        """Test that distinct elements with the same markup are all included, not merged."""
+        html = "<ul><li>Same</li><li>Other</li><li>Same</li></ul>"
+        md = converter.convert(html, only_main_content=False, include_tags=["li"])
+        assert md.count("Same") == 2
+        assert "Other" in md
+
+    def test_no_matching_include_tags_returns_full_content(self, converter):
         """Test that when no include_tags match, full content is returned."""
-        converter = MarkdownConverter()
         html = "<p>Paragraph content</p>"
         md = converter.convert(
             html,
@@ -376,9 +501,8 @@ class TestIncludeExcludeTags:
         # Should fall back to full content
         assert "Paragraph content" in md
 
-    def test_attribute_selector(self):
+    def test_attribute_selector(self, converter):
         """Test that attribute selectors work."""
-        converter = MarkdownConverter()
         html = """
         <div>Regular div</div>
         <div data-content="true"><p>Data content</p></div>
@@ -392,9 +516,8 @@ class TestIncludeExcludeTags:
         assert "Data content" in md
         assert "Regular div" not in md
 
-    def test_id_selector(self):
+    def test_id_selector(self, converter):
         """Test that ID selectors work."""
-        converter = MarkdownConverter()
         html = """
         <div id="other">Other</div>
         <div id="content"><p>Main content</p></div>
@@ -412,17 +535,17 @@ class TestIncludeExcludeTags:
 class TestMkDocsMaterialPreprocessing:
     """Tests for MkDocs Material HTML preprocessing."""
 
-    def test_strips_headerlink_anchors(self):
+    def test_strips_headerlink_anchors(self, make_soup):
         """Test that permalink anchors are stripped from headings."""
         html = """
         <h1 id="title">Title<a class="headerlink" href="#title" title="Permanent link">¶</a></h1>
         <h2 id="section">Section<a class="headerlink" href="#section">¶</a></h2>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_mkdocs_material(soup)
 
         # Headerlinks should be removed
-        assert soup.select("a.headerlink") == []
+        assert soup.find("a", class_="headerlink") is None
         # But headings should remain
         h1 = soup.find("h1")
         h2 = soup.find("h2")
@@ -431,7 +554,7 @@ class TestMkDocsMaterialPreprocessing:
         assert h1.get_text(strip=True) == "Title"
         assert h2.get_text(strip=True) == "Section"
 
-    def test_converts_highlighttable_to_code_block(self):
+    def test_converts_highlighttable_to_code_block(self, make_soup):
         """Test that line-numbered code tables are converted to proper code blocks."""
         html = """
         <table class="highlighttable">
@@ -448,7 +571,7 @@ int y = 2;</code></pre>
             </tbody>
         </table>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_mkdocs_material(soup)
 
         # Table should be replaced with pre/code
@@ -458,7 +581,7 @@ int y = 2;</code></pre>
         assert "int x = 1" in code.get_text()
         assert "int y = 2" in code.get_text()
 
-    def test_converts_admonition_to_blockquote(self):
+    def test_converts_admonition_to_blockquote(self, make_soup):
         """Test that admonitions are converted to blockquotes with bold titles."""
         html = """
         <div class="admonition note">
@@ -466,7 +589,7 @@ int y = 2;</code></pre>
             <p>This is important information.</p>
         </div>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_mkdocs_material(soup)
 
         # Admonition should be replaced with blockquote
@@ -478,7 +601,7 @@ int y = 2;</code></pre>
         assert "Note:" in strong.get_text()
         assert "important information" in blockquote.get_text()
 
-    def test_converts_admonition_with_custom_title(self):
+    def test_converts_admonition_with_custom_title(self, make_soup):
         """Test that admonitions preserve custom titles."""
         html = """
         <div class="admonition example">
@@ -486,7 +609,7 @@ int y = 2;</code></pre>
             <p>Example content here.</p>
         </div>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_mkdocs_material(soup)
 
         blockquote = soup.find("blockquote")
@@ -494,7 +617,7 @@ int y = 2;</code></pre>
         assert "Working with JSON:" in blockquote.get_text()
         assert "Example content" in blockquote.get_text()
 
-    def test_handles_tabbed_content(self):
+    def test_handles_tabbed_content(self, make_soup):
         """Test that tabbed content gets clear language headers."""
         html = """
         <div class="tabbed-set tabbed-alternate">
@@ -512,24 +635,25 @@ int y = 2;</code></pre>
             </div>
         </div>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_mkdocs_material(soup)
+        index = NodeIndex(soup)
+        text = soup.get_text()
 
         # Tabbed set should be replaced
-        assert soup.find("div", class_="tabbed-set") is None
+        assert not index.with_class("tabbed-set", "div")
         # Should have h4 headers for each tab
-        headers = soup.find_all("h4")
+        headers = index.by_tag["h4"]
         assert len(headers) == 2
         header_texts = [h.get_text(strip=True) for h in headers]
         assert "C#" in header_texts
         assert "Python" in header_texts
         # Content should be preserved
-        assert "C# code example" in soup.get_text()
-        assert "Python code example" in soup.get_text()
+        assert "C# code example" in text
+        assert "Python code example" in text
 
-    def test_full_conversion_with_mkdocs_material(self):
+    def test_full_conversion_with_mkdocs_material(self, converter):
         """Test full conversion of MkDocs Material HTML to markdown."""
-        converter = MarkdownConverter()
         html = """
         <html>
         <body>
@@ -551,18 +675,12 @@ int y = 2;</code></pre>
         """
         md = converter.convert(html, only_main_content=False)
 
-        # Heading should not have permalink
-        assert "¶" not in md
-        assert "headerlink" not in md
-        # Should have Note blockquote
-        assert "**Note:**" in md
-        assert "Important info" in md
-        # Code should be preserved
-        assert 'print("hello")' in md
-        # Should not have table markup for code
-        assert "| ---" not in md
-
-    def test_preserves_regular_tables(self):
+        # Should have Note blockquote, and code should be preserved
+        assert missing_substrings(md, "**Note:**", "Important info", 'print("hello")') == []
+        # Heading should not have permalink, and no table markup for code
+        assert not any(s in md for s in ("¶", "headerlink", "| ---"))
+
+    def test_preserves_regular_tables(self, make_soup):
         """Test that regular tables are not affected by highlighttable processing."""
         html = """
         <table>
@@ -570,7 +688,7 @@ int y = 2;</code></pre>
             <tr><td>Data</td></tr>
         </table>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_mkdocs_material(soup)
 
         # Regular table should still exist
@@ -578,78 +696,200 @@ int y = 2;</code></pre>
         assert "Header" in soup.get_text()
         assert "Data" in soup.get_text()
 
-    def test_handles_empty_elements_gracefully(self):
+    def test_handles_empty_elements_gracefully(self, make_soup):
         """Test that empty or malformed elements don't crash preprocessing."""
         html = """
         <div class="admonition note"></div>
         <table class="highlighttable"></table>
         <div class="tabbed-set"></div>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         # Should not raise
         _preprocess_mkdocs_material(soup)
 
+        # The empty admonition and tab set are still replaced; the codeless table is left alone
+        assert soup.find("div", class_="admonition") is None
+        assert soup.find("div", class_="tabbed-set") is None
+        assert soup.find("blockquote").get_text(strip=True) == "Note:"
+
+    def test_admonition_title_not_repeated_in_content(self, make_soup):
+        """Test that the admonition title appears once, whether a direct child or nested."""
+        for html in [
+            '<div class="admonition tip"><p class="admonition-title">Heads up</p><p>Body</p></div>',
+            '<div class="admonition tip"><div><p class="admonition-title">Heads up</p><p>Body</p></div></div>',
+        ]:
+            soup = make_soup(html)
+            _preprocess_mkdocs_material(soup)
+            assert soup.find("blockquote").get_text(" ", strip=True) == "Heads up: Body"
+
+    def test_nested_admonition_flattened_into_outer(self, make_soup):
+        """Test that an admonition inside another is folded into the outer blockquote only."""
+        html = """
+        <div class="admonition note">
+            <p class="admonition-title">Outer</p>
+            <p>Intro</p>
+            <div class="admonition tip"><p class="admonition-title">Inner</p><p>Detail</p></div>
+        </div>
+        """
+        soup = make_soup(html)
+        _preprocess_mkdocs_material(soup)
+        blockquotes = soup.find_all("blockquote")
+        assert len(blockquotes) == 1
+        assert blockquotes[0].strong.get_text() == "Outer:"
+        assert "Detail" in blockquotes[0].get_text()
+
 
 class TestSitePreprocessorRegistry:
     """Tests for the site preprocessor registry and detection."""
 
     def test_registry_has_mkdocs_material(self):
         """Test that MkDocs Material is registered."""
-        names = [p.name for p in SITE_PREPROCESSORS]
-        assert "mkdocs_material" in names
+        assert "mkdocs_material" in SITE_PREPROCESSORS_BY_NAME
 
-    def test_detect_mkdocs_by_md_content_class(self):
+    def test_detect_mkdocs_by_md_content_class(self, make_soup):
         """Test detection via md-content class."""
         html = '<div class="md-content"><p>Content</p></div>'
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         assert _detect_mkdocs_material(soup) is True
 
-    def test_detect_mkdocs_by_data_md_attribute(self):
+    def test_detect_mkdocs_by_data_md_attribute(self, make_soup):
         """Test detection via data-md-* attributes."""
         html = '<div data-md-component="content"><p>Content</p></div>'
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         assert _detect_mkdocs_material(soup) is True
 
-    def test_detect_mkdocs_by_multiple_indicators(self):
+    def test_detect_mkdocs_by_multiple_indicators(self, make_soup):
         """Test detection via combination of MkDocs elements."""
         html = """
         <h1>Title<a class="headerlink" href="#">¶</a></h1>
         <div class="admonition note"><p>Note</p></div>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         assert _detect_mkdocs_material(soup) is True
 
-    def test_no_detection_for_plain_html(self):
+    def test_no_detection_for_plain_html(self, make_soup):
         """Test that plain HTML is not detected as MkDocs."""
         html = "<html><body><h1>Title</h1><p>Content</p></body></html>"
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         assert _detect_mkdocs_material(soup) is False
 
-    def test_no_detection_for_single_indicator(self):
+    def test_no_detection_for_single_indicator(self, make_soup):
         """Test that a single indicator is not enough for detection."""
         html = '<h1>Title<a class="headerlink" href="#">¶</a></h1>'
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         # Only one indicator (headerlink) - should not detect
         assert _detect_mkdocs_material(soup) is False
 
-    def test_apply_site_preprocessors_returns_applied_names(self):
+    def test_apply_site_preprocessors_returns_applied_names(self, make_soup):
         """Test that apply_site_preprocessors returns list of applied preprocessors."""
         html = """
         <div class="md-content">
             <h1>Title<a class="headerlink" href="#">¶</a></h1>
         </div>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         applied = apply_site_preprocessors(soup)
         assert "mkdocs_material" in applied
 
-    def test_apply_site_preprocessors_empty_for_plain_html(self):
+    def test_apply_site_preprocessors_empty_for_plain_html(self, make_soup):
         """Test that no preprocessors are applied to plain HTML."""
         html = "<html><body><p>Plain content</p></body></html>"
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         applied = apply_site_preprocessors(soup)
         assert applied == []
 
+    def test_soup_cache_isolation(self, make_soup):
+        """Test that preprocessing one parse of a fragment leaves later parses untouched."""
+        html = '<div class="md-content"><h1>Title<a class="headerlink" href="#t">¶</a></h1></div>'
+        first = make_soup(html)
+        assert "mkdocs_material" in apply_site_preprocessors(first)
+        assert first.find("a", class_="headerlink") is None
+
+        second = make_soup(html)
+        assert second is not first
+        assert second.find("a", class_="headerlink") is not None
+
+    def test_quick_marker_scan_rejects_plain_html(self):
+        """Test that plain pages are rejected by the marker scan before any tree walk."""
+        assert _QUICK_SITE_RE is not None
+        assert _QUICK_SITE_RE.search("<html><p>plain</p></html>") is None
+
+    def test_apply_site_preprocessors_with_raw_html_matches_soup_only(self, make_soup):
+        """Test that passing the raw HTML only skips work, never changes the result."""
+        fixtures = [
+            '<div class="md-content"><h1>Title<a class="headerlink" href="#">¶</a></h1></div>',
+            '<p data-list-level="1">One</p><p data-list-level="2">Two</p>',
+            '<meta name="generator" content="WordPress 6.4"><div class="fixed-nav">Nav</div><p>Body</p>',
+            "<html><body><p>Plain content</p></body></html>",
+        ]
+        for html in fixtures:
+            with_html = make_soup(html)
+            soup_only = make_soup(html)
+            assert apply_site_preprocessors(with_html, html) == apply_site_preprocessors(soup_only)
+            assert str(with_html) == str(soup_only)
+
+    def test_could_match_checks_only_own_markers(self):
+        """Test that each preprocessor's marker scan ignores other frameworks' markers."""
+        by_name = SITE_PREPROCESSORS_BY_NAME
+        html = '<div class="wp-block-group"><p>Body</p></div>'
+
+        assert by_name["wordpress"].could_match(html)
+        assert not by_name["mkdocs_material"].could_match(html)
+        assert not by_name["css_counter_lists"].could_match(html)
+
+    @pytest.mark.parametrize(
+        ("name", "html"),
+        [
+            ("mkdocs_material", '<div class="md-content"><p>Docs</p></div>'),
+            ("mkdocs_material", '<header data-md-component="header"></header>'),
+            ("mkdocs_material", '<a class="headerlink" href="#x">¶</a><div class="admonition note"></div>'),
+            ("mkdocs_material", '<div class="tabbed-set"></div><table class="highlighttable"></table>'),
+            ("css_counter_lists", '<p DATA-LIST-LEVEL="1">Item</p>'),
+            ("wordpress", '<div class="wp-block-group"></div>'),
+            ("wordpress", '<article class="hentry"></article>'),
+            ("wordpress", '<div class="single-post-meta"></div>'),
+            ("wordpress", '<meta name="generator" content="WordPress 6.4">'),
+        ],
+    )
+    def test_fast_detect_never_rejects_a_detected_page(self, make_soup, name, html):
+        """Test that the raw-HTML marker scan passes every page the soup detector accepts."""
+        preprocessor = SITE_PREPROCESSORS_BY_NAME[name]
+        assert preprocessor.detect(make_soup(html), None)
+        assert _QUICK_SITE_RE is not None
+        assert _QUICK_SITE_RE.search(html)
+        assert preprocessor.could_match(html)
+
+    def test_could_match_without_markers_always_runs_detection(self):
+        """Test that a preprocessor declaring no markers is never skipped."""
+
+        def detect(soup: BeautifulSoup, index: NodeIndex | None) -> bool:
+            return False
+
+        def preprocess(soup: BeautifulSoup, index: NodeIndex | None) -> None:
+            pass
+
+        preprocessor = SitePreprocessor(
+            name="custom",
+            description="No raw-HTML markers",
+            examples=["example.com"],
+            detect=detect,
+            preprocess=preprocess,
+        )
+        assert preprocessor.could_match("<p>anything</p>")
+
+    @pytest.mark.parametrize("pass_html", [True, False], ids=["with-html", "soup-only"])
+    def test_preprocess_skipped_when_detection_fails(self, make_soup, monkeypatch, pass_html):
+        """Test that a page whose text trips the WordPress markers is never preprocessed as WordPress."""
+        html = "<html><body><p>A post-rock wp- generator review of entry-content</p></body></html>"
+        wordpress = SITE_PREPROCESSORS_BY_NAME["wordpress"]
+        # Recorded rather than raised: the registry logs and swallows preprocessor errors
+        calls: list[BeautifulSoup] = []
+        monkeypatch.setattr(wordpress, "preprocess", lambda soup, index=None: calls.append(soup))
+
+        assert wordpress.could_match(html)
+        assert apply_site_preprocessors(make_soup(html), html if pass_html else None) == []
+        assert calls == []
+
     def test_preprocessor_registry_has_required_fields(self):
         """Test that all registered preprocessors have required documentation."""
         for preprocessor in SITE_PREPROCESSORS:
@@ -658,41 +898,109 @@ class TestSitePreprocessorRegistry:
             assert preprocessor.examples, "Preprocessor must have example sites"
             assert callable(preprocessor.detect), "Preprocessor must have detect function"
             assert callable(preprocessor.preprocess), "Preprocessor must have preprocess function"
+            assert preprocessor.markers, "Preprocessor should declare raw-HTML markers for the quick scan"
+        assert len(SITE_PREPROCESSORS_BY_NAME) == len(SITE_PREPROCESSORS), "Preprocessor names must be unique"
+
+
+class TestNodeIndex:
+    """Tests for the single-traversal NodeIndex shared by site preprocessors."""
+
+    def test_indexes_tags_classes_and_attributes_in_document_order(self, make_soup):
+        """Test that lookups return the same elements, in the same order, as select()."""
+        html = """
+        <div class="admonition note"><p data-list-level="1">One</p></div>
+        <div class="admonition warning"><p data-list-level="2">Two</p></div>
+        <span class="note">Not a div</span>
+        """
+        soup = make_soup(html)
+        index = NodeIndex(soup)
+
+        assert index.with_class("admonition", "div") == soup.select("div.admonition")
+        assert index.with_class("note") == soup.select(".note")
+        assert index.with_attr("data-list-level", "p") == soup.select("p[data-list-level]")
+        assert index.by_tag["p"] == soup.find_all("p")
+
+    def test_class_fragment_lookup_matches_substring_selector(self, make_soup):
+        """Test that with_class_containing mirrors [class*='...'] selectors."""
+        html = '<div class="star-rating"></div><div class="ratings-box"></div><div class="review"></div>'
+        soup = make_soup(html)
+        index = NodeIndex(soup)
+
+        assert index.with_class_containing("rating") == soup.select("[class*='rating']")
+
+    def test_missing_lookups_do_not_grow_the_index(self, make_soup):
+        """Test that querying an absent class or attribute leaves the index unchanged."""
+        index = NodeIndex(make_soup("<p>Plain</p>"))
+
+        assert index.with_class("md-content") == []
+        assert index.with_attr("data-md-component") == []
+        assert "md-content" not in index.by_class
+        assert "data-md-component" not in index.by_attr
+
+    def test_index_rebuilt_only_when_another_preprocessor_needs_it(self, make_soup, monkeypatch):
+        """Test that the tree is not re-indexed after the last candidate has been applied."""
+        built: list[NodeIndex] = []
+
+        class CountingIndex(NodeIndex):
+            def __init__(self, soup):
+                super().__init__(soup)
+                built.append(self)
+
+        monkeypatch.setattr("supacrawl.services.converter.NodeIndex", CountingIndex)
+        html = '<div class="md-content"><p>Docs</p></div>'
+
+        assert apply_site_preprocessors(make_soup(html), html) == ["mkdocs_material"]
+        assert len(built) == 1
+
+    def test_wordpress_skips_elements_removed_with_an_ancestor(self, make_soup):
+        """Test that nested matches already torn down by an earlier removal are skipped."""
+        html = """
+        <article class="post">
+            <p>Body</p>
+            <nav class="post-navigation"><div class="nav-links"><a href="/prev">Prev</a></div></nav>
+        </article>
+        """
+        soup = make_soup(html)
+        _preprocess_wordpress(soup, NodeIndex(soup))
+
+        assert soup.find(class_="post-navigation") is None
+        assert soup.find(class_="nav-links") is None
+        assert "Body" in soup.get_text()
 
 
 class TestCssCounterListsPreprocessing:
     """Tests for CSS counter-based lists HTML preprocessing."""
 
-    def test_detect_css_counter_lists(self):
+    def test_detect_css_counter_lists(self, make_soup):
         """Test detection of CSS counter-based lists."""
         html = """
         <p class="list-item" data-list-level="2">First item</p>
         <p class="list-item" data-list-level="2">Second item</p>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         assert _detect_css_counter_lists(soup) is True
 
-    def test_no_detection_without_data_list_level(self):
+    def test_no_detection_without_data_list_level(self, make_soup):
         """Test that regular paragraphs are not detected as CSS counter lists."""
         html = "<p>Regular paragraph</p><p>Another paragraph</p>"
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         assert _detect_css_counter_lists(soup) is False
 
-    def test_converts_simple_list(self):
+    def test_converts_simple_list(self, make_soup):
         """Test conversion of simple CSS counter list to ordered list."""
         html = """
         <p data-list-level="2">First item</p>
         <p data-list-level="2">Second item</p>
         <p data-list-level="2">Third item</p>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_css_counter_lists(soup)
 
         # Should have one ordered list
         ol = soup.find("ol")
         assert ol is not None
         # Should have three list items
-        lis = ol.find_all("li", recursive=False)
+        lis = _direct_li(ol)
         assert len(lis) == 3
         assert "First item" in lis[0].get_text()
         assert "Second item" in lis[1].get_text()
@@ -700,7 +1008,7 @@ class TestCssCounterListsPreprocessing:
         # Original p tags should be gone
         assert len(soup.find_all("p", attrs={"data-list-level": True})) == 0
 
-    def test_converts_nested_list(self):
+    def test_converts_nested_list(self, make_soup):
         """Test conversion of nested CSS counter lists."""
         html = """
         <p data-list-level="2">First item</p>
@@ -708,7 +1016,7 @@ class TestCssCounterListsPreprocessing:
         <p data-list-level="3">Sub-item B</p>
         <p data-list-level="2">Second item</p>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_css_counter_lists(soup)
 
         # Find the root list
@@ -716,7 +1024,7 @@ class TestCssCounterListsPreprocessing:
         assert root_ol is not None
 
         # Root should have 2 direct children (First item, Second item)
-        root_lis = root_ol.find_all("li", recursive=False)
+        root_lis = _direct_li(root_ol)
         assert len(root_lis) == 2
         assert "First item" in root_lis[0].get_text()
 
@@ -725,7 +1033,7 @@ class TestCssCounterListsPreprocessing:
         assert nested_ol is not None
 
         # Nested list should have 2 items
-        nested_lis = nested_ol.find_all("li", recursive=False)
+        nested_lis = _direct_li(nested_ol)
         assert len(nested_lis) == 2
         assert "Sub-item A" in nested_lis[0].get_text()
         assert "Sub-item B" in nested_lis[1].get_text()
@@ -734,7 +1042,7 @@ class TestCssCounterListsPreprocessing:
         assert root_lis[1].find("ol") is None
         assert "Second item" in root_lis[1].get_text()
 
-    def test_converts_complex_hierarchy(self):
+    def test_converts_complex_hierarchy(self, make_soup):
         """Test conversion of complex multi-level hierarchy."""
         html = """
         <p data-list-level="2">Level 2 - Item 1</p>
@@ -744,7 +1052,7 @@ class TestCssCounterListsPreprocessing:
         <p data-list-level="3">Level 3 - Item B</p>
         <p data-list-level="2">Level 2 - Item 2</p>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_css_counter_lists(soup)
 
         # Check structure
@@ -752,31 +1060,31 @@ class TestCssCounterListsPreprocessing:
         assert root_ol is not None
 
         # Root should have 2 items
-        root_lis = root_ol.find_all("li", recursive=False)
+        root_lis = _direct_li(root_ol)
         assert len(root_lis) == 2
 
         # First root item should have nested list
         level3_ol = root_lis[0].find("ol")
         assert level3_ol is not None
-        level3_lis = level3_ol.find_all("li", recursive=False)
+        level3_lis = _direct_li(level3_ol)
         assert len(level3_lis) == 2
 
         # First level 3 item should have nested list
         level4_ol = level3_lis[0].find("ol")
         assert level4_ol is not None
-        level4_lis = level4_ol.find_all("li", recursive=False)
+        level4_lis = _direct_li(level4_ol)
         assert len(level4_lis) == 2
         assert "Level 4 - Item i" in level4_lis[0].get_text()
         assert "Level 4 - Item ii" in level4_lis[1].get_text()
 
-    def test_handles_gap_in_levels(self):
+    def test_handles_gap_in_levels(self, make_soup):
         """Test handling of level gaps (e.g., level 2 to level 4)."""
         html = """
         <p data-list-level="2">Level 2</p>
         <p data-list-level="4">Level 4 (skipped 3)</p>
         <p data-list-level="2">Level 2 again</p>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         # Should not crash
         _preprocess_css_counter_lists(soup)
 
@@ -784,13 +1092,24 @@ class TestCssCounterListsPreprocessing:
         ol = soup.find("ol")
         assert ol is not None
 
-    def test_preserves_element_attributes_in_content(self):
+    def test_handles_nesting_deeper_than_recursion_limit(self, make_soup):
+        """Test that nesting is rebuilt iteratively, so depth is not bounded by the recursion limit."""
+        depth = 1200
+        html = "".join(f'<p data-list-level="{level}">Item {level}</p>' for level in range(1, depth + 1))
+        soup = make_soup(html)
+        _preprocess_css_counter_lists(soup)
+
+        deepest = soup.find_all("li")[-1]
+        assert deepest.get_text() == f"Item {depth}"
+        assert sum(1 for parent in deepest.parents if parent.name == "ol") == depth
+
+    def test_preserves_element_attributes_in_content(self, make_soup):
         """Test that content within list items preserves attributes."""
         html = """
         <p data-list-level="2">Item with <strong>bold</strong> text</p>
         <p data-list-level="2">Item with <a href="/link">link</a></p>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_css_counter_lists(soup)
 
         ol = soup.find("ol")
@@ -805,24 +1124,24 @@ class TestCssCounterListsPreprocessing:
         assert anchor is not None
         assert anchor.get("href") == "/link"
 
-    def test_handles_empty_list_items(self):
+    def test_handles_empty_list_items(self, make_soup):
         """Test that empty list items are handled gracefully."""
         html = """
         <p data-list-level="2">First item</p>
         <p data-list-level="2"></p>
         <p data-list-level="2">Third item</p>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_css_counter_lists(soup)
 
         ol = soup.find("ol")
         assert ol is not None
-        lis = ol.find_all("li", recursive=False)
+        lis = _direct_li(ol)
         assert len(lis) == 3
         # Empty item should still be present
         assert lis[1].get_text(strip=True) == ""
 
-    def test_multiple_separate_lists(self):
+    def test_multiple_separate_lists(self, make_soup):
         """Test handling of multiple separate list groups."""
         html = """
         <p data-list-level="2">List 1 - Item 1</p>
@@ -831,7 +1150,7 @@ class TestCssCounterListsPreprocessing:
         <p data-list-level="2">List 2 - Item 1</p>
         <p data-list-level="2">List 2 - Item 2</p>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_css_counter_lists(soup)
 
         # Should have two separate ordered lists
@@ -840,9 +1159,8 @@ class TestCssCounterListsPreprocessing:
         # At minimum should have created list structures
         assert len(ols) >= 1
 
-    def test_full_conversion_to_markdown(self):
+    def test_full_conversion_to_markdown(self, converter):
         """Test full conversion of CSS counter lists to markdown."""
-        converter = MarkdownConverter()
         html = """
         <html>
         <body>
@@ -857,15 +1175,13 @@ class TestCssCounterListsPreprocessing:
 
         # Should have list markers (exact format depends on markdownify)
         # At minimum, items should be present
-        assert "First numbered item" in md
-        assert "First lettered sub-item" in md
-        assert "Second lettered sub-item" in md
-        assert "Second numbered item" in md
+        items = ("First numbered item", "First lettered sub-item", "Second lettered sub-item", "Second numbered item")
+        assert missing_substrings(md, *items) == []
 
         # Should not have data-list-level in output
         assert "data-list-level" not in md
 
-    def test_real_world_example(self):
+    def test_real_world_example(self, make_soup):
         """Test with a real-world example of CSS counter-based nested lists."""
         html = """
         <p class="Vol2_num_alpha_num" data-list-level="2" style="counter-set: item2 1;">
@@ -881,7 +1197,7 @@ class TestCssCounterListsPreprocessing:
             take all measures necessary to support...
         </p>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_css_counter_lists(soup)
 
         # Should have created proper list structure
@@ -889,7 +1205,7 @@ class TestCssCounterListsPreprocessing:
         assert root_ol is not None
 
         # Should have 2 root items
-        root_lis = root_ol.find_all("li", recursive=False)
+        root_lis = _direct_li(root_ol)
         assert len(root_lis) == 2
         assert "Standards Authority" in root_lis[0].get_text()
         assert "Managers" in root_lis[1].get_text()
@@ -897,17 +1213,41 @@ class TestCssCounterListsPreprocessing:
         # Second root item should have nested list
         nested_ol = root_lis[1].find("ol")
         assert nested_ol is not None
-        nested_lis = nested_ol.find_all("li", recursive=False)
+        nested_lis = _direct_li(nested_ol)
         assert len(nested_lis) == 2
         assert "ensure compliance" in nested_lis[0].get_text()
         assert "take all measures" in nested_lis[1].get_text()
 
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [("3", 3), (" 2 ", 2), ("invalid", 1), ("3.5", 1), ("", 1), (None, 1)],
+    )
+    def test_get_list_level(self, make_soup, value, expected):
+        """Test level parsing, including repeats that are served from the memo."""
+        attr = "" if value is None else f' data-list-level="{value}"'
+        item = make_soup(f"<p{attr}>Item</p>").p
+        assert _get_list_level(item) == expected
+        assert _get_list_level(item) == expected
+
+    @pytest.mark.parametrize(
+        ("levels", "list_of", "parents"),
+        [
+            ([1, 1, 1], [0, 0, 0], [(-1, -1)]),
+            ([1, 2, 2, 1], [0, 1, 1, 0], [(-1, -1), (0, 0)]),
+            ([1, 2, 3, 2, 1, 2], [0, 1, 2, 1, 0, 3], [(-1, -1), (0, 0), (1, 1), (0, 4)]),
+            ([2, 1], [1, 0], [(-1, -1), (0, -1)]),
+        ],
+        ids=["flat", "nested", "deep-then-reopen", "starts-deeper-than-root"],
+    )
+    def test_nest_levels(self, levels, list_of, parents):
+        """Test the DOM-free nesting pass that drives list construction."""
+        assert _nest_levels(levels) == (list_of, parents)
+
     def test_registry_includes_css_counter_lists(self):
         """Test that CSS counter lists preprocessor is registered."""
-        names = [p.name for p in SITE_PREPROCESSORS]
-        assert "css_counter_lists" in names
+        assert "css_counter_lists" in SITE_PREPROCESSORS_BY_NAME
 
-    def test_handles_invalid_data_list_level(self):
+    def test_handles_invalid_data_list_level(self, make_soup):
         """Test that invalid data-list-level values are handled gracefully."""
         html = """
         <p data-list-level="2">Valid item</p>
@@ -915,7 +1255,7 @@ class TestCssCounterListsPreprocessing:
         <p data-list-level="3.5">Float level - should default to 1</p>
         <p data-list-level="2">Another valid item</p>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         # Should not crash
         _preprocess_css_counter_lists(soup)
 
@@ -929,14 +1269,14 @@ class TestCssCounterListsPreprocessing:
         lis = soup.find_all("li")
         assert len(lis) == 4
 
-    def test_handles_missing_data_list_level(self):
+    def test_handles_missing_data_list_level(self, make_soup):
         """Test that missing data-list-level attributes are handled."""
         html = """
         <p data-list-level="2">First item</p>
         <p data-list-level="">Empty level - should default</p>
         <p data-list-level="2">Third item</p>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         # Should not crash
         _preprocess_css_counter_lists(soup)
 
@@ -948,7 +1288,7 @@ class TestCssCounterListsPreprocessing:
 class TestWordPressPreprocessor:
     """Tests for WordPress preprocessor."""
 
-    def test_detect_wordpress_by_wp_class(self):
+    def test_detect_wordpress_by_wp_class(self, make_soup):
         """Test WordPress detection via wp- prefixed classes."""
         html = """
         <html>
@@ -957,10 +1297,15 @@ class TestWordPressPreprocessor:
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
+        assert _detect_wordpress(soup) is True
+
+    def test_detect_wordpress_by_body_class(self, make_soup):
+        """Test WordPress detection from the classes body_class() puts on <body>."""
+        soup = make_soup('<html><body class="post-template-default single single-post"><p>Content</p></body></html>')
         assert _detect_wordpress(soup) is True
 
-    def test_detect_wordpress_by_post_classes(self):
+    def test_detect_wordpress_by_post_classes(self, make_soup):
         """Test WordPress detection via post-related classes."""
         html = """
         <html>
@@ -971,10 +1316,10 @@ class TestWordPressPreprocessor:
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         assert _detect_wordpress(soup) is True
 
-    def test_detect_wordpress_by_meta_generator(self):
+    def test_detect_wordpress_by_meta_generator(self, make_soup):
         """Test WordPress detection via meta generator tag."""
         html = """
         <html>
@@ -984,10 +1329,10 @@ class TestWordPressPreprocessor:
             <body>Content</body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         assert _detect_wordpress(soup) is True
 
-    def test_detect_non_wordpress_site(self):
+    def test_detect_non_wordpress_site(self, make_soup):
         """Test that non-WordPress sites are not detected."""
         html = """
         <html>
@@ -996,10 +1341,10 @@ class TestWordPressPreprocessor:
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         assert _detect_wordpress(soup) is False
 
-    def test_preprocess_wordpress_removes_fixed_nav(self):
+    def test_preprocess_wordpress_removes_fixed_nav(self, make_soup):
         """Test removal of .fixed-nav elements (BeTheme duplication bug)."""
         html = """
         <html>
@@ -1013,7 +1358,7 @@ class TestWordPressPreprocessor:
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_wordpress(soup)
 
         # Navigation should be removed
@@ -1025,7 +1370,7 @@ class TestWordPressPreprocessor:
         assert soup.find("h1") is not None
         assert soup.find("p") is not None
 
-    def test_preprocess_wordpress_removes_post_navigation(self):
+    def test_preprocess_wordpress_removes_post_navigation(self, make_soup):
         """Test removal of post navigation elements."""
         html = """
         <html>
@@ -1040,7 +1385,7 @@ class TestWordPressPreprocessor:
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_wordpress(soup)
 
         # Post navigation should be removed
@@ -1050,7 +1395,7 @@ class TestWordPressPreprocessor:
         # Content should remain
         assert soup.find("article") is not None
 
-    def test_preprocess_wordpress_removes_share_widgets(self):
+    def test_preprocess_wordpress_removes_share_widgets(self, make_soup):
         """Test removal of share widget elements."""
         html = """
         <html>
@@ -1063,7 +1408,7 @@ class TestWordPressPreprocessor:
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_wordpress(soup)
 
         # Share widgets should be removed
@@ -1072,7 +1417,7 @@ class TestWordPressPreprocessor:
         # Content should remain
         assert soup.find("article") is not None
 
-    def test_preprocess_wordpress_removes_related_posts(self):
+    def test_preprocess_wordpress_removes_related_posts(self, make_soup):
         """Test removal of related posts sections."""
         html = """
         <html>
@@ -1086,7 +1431,7 @@ class TestWordPressPreprocessor:
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_wordpress(soup)
 
         # Related posts should be removed
@@ -1095,7 +1440,7 @@ class TestWordPressPreprocessor:
         # Content should remain
         assert soup.find("article") is not None
 
-    def test_preprocess_wordpress_comprehensive(self):
+    def test_preprocess_wordpress_comprehensive(self, make_soup):
         """Test comprehensive WordPress preprocessing (real-world scenario)."""
         html = """
         <html>
@@ -1121,7 +1466,7 @@ class TestWordPressPreprocessor:
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_wordpress(soup)
 
         # All WordPress boilerplate should be removed
@@ -1136,7 +1481,7 @@ class TestWordPressPreprocessor:
         paragraphs = soup.find_all("p")
         assert len(paragraphs) == 2
 
-    def test_preprocess_wordpress_preserves_title(self):
+    def test_preprocess_wordpress_preserves_title(self, make_soup):
         """Test that page title H1 is preserved by moving it into main content."""
         html = """
         <html>
@@ -1153,7 +1498,7 @@ class TestWordPressPreprocessor:
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_wordpress(soup)
 
         # Title should be moved into main content
@@ -1164,11 +1509,26 @@ class TestWordPressPreprocessor:
         assert "Page Title from Header" in h1_in_main.get_text()
 
         # Should be the first element in main
-        first_child = list(main.children)[0]
+        first_child = main.contents[0]
         assert isinstance(first_child, Tag)
         assert first_child.name == "h1"
 
-    def test_preprocess_wordpress_removes_rating_forms(self):
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            ('<div id="Subheader"><h1 class="title">Sub</h1></div><span class="entry-title">Entry</span>', "Sub"),
+            ('<header><h1>Header</h1></header><h2 class="entry-title">Entry</h2>', "Entry"),
+            ('<header><h1>Header</h1></header><h2 class="page-title">Page</h2>', "Page"),
+            ('<h1 class="title">No subheader</h1><header><div><h1>Header</h1></div></header>', "Header"),
+        ],
+    )
+    def test_preprocess_wordpress_title_lookup_order(self, make_soup, header, expected):
+        """Test that the title comes from the first matching header location, in priority order."""
+        soup = make_soup(f"<html><body>{header}<article><p>Body</p></article></body></html>")
+        _preprocess_wordpress(soup)
+        assert soup.find("article").find("h1").get_text() == expected
+
+    def test_preprocess_wordpress_removes_rating_forms(self, make_soup):
         """Test removal of rating and feedback forms."""
         html = """
         <html>
@@ -1183,7 +1543,7 @@ class TestWordPressPreprocessor:
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_wordpress(soup)
 
         # Rating forms should be removed
@@ -1193,7 +1553,7 @@ class TestWordPressPreprocessor:
         assert soup.find("article") is not None
         assert "Main content" in soup.get_text()
 
-    def test_preprocess_wordpress_removes_svg_placeholders(self):
+    def test_preprocess_wordpress_removes_svg_placeholders(self, make_soup):
         """Test removal of lazy-loading SVG placeholder images."""
         html = """
         <html>
@@ -1206,12 +1566,11 @@ class TestWordPressPreprocessor:
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         _preprocess_wordpress(soup)
 
         # SVG placeholder should be removed
-        svg_imgs = [img for img in soup.find_all("img") if str(img.get("src", "")).startswith("data:image/svg")]
-        assert len(svg_imgs) == 0
+        assert soup.select('img[src^="data:image/svg"]') == []
 
         # Real image should remain
         real_imgs = [img for img in soup.find_all("img") if "example.com" in str(img.get("src", ""))]
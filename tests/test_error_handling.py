@@ -1,83 +1,96 @@
 """Error handling E2E tests - test error scenarios and recovery."""
 
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
 import pytest
+import pytest_asyncio
 
+from supacrawl.models import ScrapeResult
 from supacrawl.services.browser import BrowserManager
 from supacrawl.services.scrape import ScrapeService
 
+# Hard ceiling on any one scrape here: well above every timeout these tests set, so
+# it only fires when a DNS lookup or socket hangs and would otherwise stall the worker
+SCRAPE_DEADLINE_S = 60
+
+
+# URLs that must fail gracefully, by case
+BAD_URLS = {
+    "invalid-url": "https://this-domain-does-not-exist-12345.com",
+    "malformed-url": "not-a-valid-url",
+    "network-error": "https://192.0.2.1",  # reserved TEST-NET-1, non-routable
+    "empty-url": "",
+}
+
+
+async def _scrape(service: ScrapeService, url: str, **kwargs: Any) -> ScrapeResult:
+    """Scrape under SCRAPE_DEADLINE_S, failing the test rather than hanging the suite."""
+    return await asyncio.wait_for(service.scrape(url, **kwargs), timeout=SCRAPE_DEADLINE_S)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def shared_browser(cdp_url: str | None) -> AsyncIterator[BrowserManager]:
+    """One browser for the whole module, so Chromium cold-starts once rather than per test.
+
+    With --supacrawl-cdp-url it attaches to that running Chromium instead, so every
+    xdist worker shares one browser process.
+    """
+    async with BrowserManager(cdp_url=cdp_url) as browser:
+        yield browser
+
+
+@pytest.fixture
+def browser(shared_browser: BrowserManager) -> Iterator[BrowserManager]:
+    """The shared browser, with any page-load timeout a test sets undone afterwards."""
+    default_timeout_ms = shared_browser.timeout_ms
+    yield shared_browser
+    shared_browser.timeout_ms = default_timeout_ms
+
 
 @pytest.mark.e2e
+@pytest.mark.asyncio(loop_scope="module")
 class TestErrorHandling:
     """Test error handling in E2E scenarios."""
 
-    @pytest.mark.asyncio
-    async def test_invalid_url_handling(self) -> None:
-        """Test handling of invalid URLs."""
+    async def test_bad_urls_fail_gracefully(self, browser: BrowserManager) -> None:
+        """Test that unresolvable, malformed, unroutable and empty URLs fail with an error."""
         # A short timeout reaches both the HTTP-first fetch and the browser so a
-        # dead host fails fast instead of waiting out the 30s default twice.
-        async with BrowserManager(timeout_ms=3000) as browser:
-            service = ScrapeService(browser=browser)
-            result = await service.scrape("https://this-domain-does-not-exist-12345.com", timeout=3000)
-
-        # Should fail gracefully with error
-        assert not result.success
-        assert result.error is not None
-
-    @pytest.mark.asyncio
-    async def test_timeout_handling(self) -> None:
+        # dead host fails fast instead of waiting out the 30s default twice. The
+        # scrapes run concurrently, so the group waits out one timeout, not each.
+        browser.timeout_ms = 3000
+        results = await asyncio.gather(
+            *(_scrape(ScrapeService(browser=browser), url, timeout=3000) for url in BAD_URLS.values()),
+            return_exceptions=True,
+        )
+
+        # Each should fail gracefully with error, not raise
+        for case, result in zip(BAD_URLS, results, strict=True):
+            assert isinstance(result, ScrapeResult), f"{case}: raised {result!r}"
+            assert not result.success, case
+            assert result.error is not None, case
+
+    @pytest.mark.requires_network
+    async def test_timeout_handling(self, browser: BrowserManager) -> None:
         """Test timeout is handled gracefully."""
-        async with BrowserManager(timeout_ms=1000) as browser:
-            service = ScrapeService(browser=browser)
-            # This might timeout depending on network
-            result = await service.scrape("https://example.com")
+        browser.timeout_ms = 1000
+        service = ScrapeService(browser=browser)
+        # This might timeout depending on network
+        result = await _scrape(service, "https://example.com")
 
         # Either succeeds (fast network) or fails gracefully (timeout)
         assert hasattr(result, "success")
         if not result.success:
             assert result.error is not None
 
-    @pytest.mark.asyncio
-    async def test_malformed_url_handling(self) -> None:
-        """Test handling of malformed URLs."""
-        async with BrowserManager() as browser:
-            service = ScrapeService(browser=browser)
-            result = await service.scrape("not-a-valid-url")
-
-        # Should fail gracefully
-        assert not result.success
-        assert result.error is not None
-
-    @pytest.mark.asyncio
-    async def test_network_error_handling(self) -> None:
-        """Test handling of network errors."""
-        async with BrowserManager(timeout_ms=3000) as browser:
-            service = ScrapeService(browser=browser)
-            # 192.0.2.1 (reserved TEST-NET-1) is non-routable; a short timeout on
-            # both the HTTP-first fetch and the browser avoids a ~60s connect hang.
-            result = await service.scrape("https://192.0.2.1", timeout=3000)
-
-        # Should fail gracefully (192.0.2.1 is reserved TEST-NET-1)
-        assert not result.success
-        assert result.error is not None
-
-    @pytest.mark.asyncio
-    async def test_empty_url_handling(self) -> None:
-        """Test handling of empty URLs."""
-        async with BrowserManager() as browser:
-            service = ScrapeService(browser=browser)
-            result = await service.scrape("")
-
-        # Should fail gracefully
-        assert not result.success
-        assert result.error is not None
-
-    @pytest.mark.asyncio
-    async def test_scrape_404_handling(self) -> None:
+    @pytest.mark.requires_network
+    async def test_scrape_404_handling(self, browser: BrowserManager) -> None:
         """Test handling of 404 errors."""
-        async with BrowserManager(timeout_ms=5000) as browser:
-            service = ScrapeService(browser=browser)
-            # Try a URL that should return 404
-            result = await service.scrape("https://example.com/this-page-does-not-exist-12345", timeout=5000)
+        browser.timeout_ms = 5000
+        service = ScrapeService(browser=browser)
+        # Try a URL that should return 404
+        result = await _scrape(service, "https://example.com/this-page-does-not-exist-12345", timeout=5000)
 
         # Should either succeed (some 404 pages are valid HTML) or fail gracefully
         assert hasattr(result, "success")
@@ -88,12 +101,12 @@ class TestErrorHandling:
         else:
             assert result.error is not None
 
-    @pytest.mark.asyncio
-    async def test_very_short_timeout(self) -> None:
+    @pytest.mark.requires_network
+    async def test_very_short_timeout(self, browser: BrowserManager) -> None:
         """Test very short timeout causes graceful failure."""
-        async with BrowserManager(timeout_ms=1) as browser:
-            service = ScrapeService(browser=browser)
-            result = await service.scrape("https://example.com", timeout=1)
+        browser.timeout_ms = 1
+        service = ScrapeService(browser=browser)
+        result = await _scrape(service, "https://example.com", timeout=1)
 
         # Should timeout and fail gracefully
         # May succeed if page loads extremely fast, but that's okay
@@ -1,6 +1,8 @@
 """Tests for LLMClient."""
 
-from unittest.mock import AsyncMock, MagicMock, patch
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
@@ -8,37 +10,92 @@ from supacrawl.exceptions import ProviderError
 from supacrawl.llm import LLMClient, LLMConfig
 
 
-class TestLLMClient:
-    """Tests for LLMClient."""
+@pytest.fixture(scope="module")
+def ollama_config() -> LLMConfig:
+    """Ollama config shared across the module; LLMConfig is frozen."""
+    return LLMConfig(
+        provider="ollama",
+        model="qwen3:8b",
+        base_url="http://localhost:11434",
+    )
 
-    @pytest.fixture
-    def ollama_config(self) -> LLMConfig:
-        """Create Ollama config for testing."""
-        return LLMConfig(
-            provider="ollama",
-            model="qwen3:8b",
-            base_url="http://localhost:11434",
-        )
 
-    @pytest.fixture
-    def openai_config(self) -> LLMConfig:
-        """Create OpenAI config for testing."""
-        return LLMConfig(
-            provider="openai",
-            model="gpt-4o-mini",
-            base_url="https://api.openai.com",
-            api_key="sk-test",
-        )
+@pytest.fixture(scope="module")
+def openai_config() -> LLMConfig:
+    """OpenAI config shared across the module."""
+    return LLMConfig(
+        provider="openai",
+        model="gpt-4o-mini",
+        base_url="https://api.openai.com",
+        api_key="sk-test",
+    )
 
-    @pytest.fixture
-    def anthropic_config(self) -> LLMConfig:
-        """Create Anthropic config for testing."""
-        return LLMConfig(
-            provider="anthropic",
-            model="claude-sonnet-4-20250514",
-            base_url="https://api.anthropic.com",
-            api_key="sk-ant-test",
-        )
+
+@pytest.fixture(scope="module")
+def anthropic_config() -> LLMConfig:
+    """Anthropic config shared across the module."""
+    return LLMConfig(
+        provider="anthropic",
+        model="claude-sonnet-4-20250514",
+        base_url="https://api.anthropic.com",
+        api_key="sk-ant-test",
+    )
+
+
+@pytest.fixture(scope="module")
+def ollama_client(ollama_config: LLMConfig) -> LLMClient:
+    """One Ollama client shared by tests that only call its pure helpers."""
+    return LLMClient(ollama_config)
+
+
+class _FakeResponse:
+    """Stand-in for an ``httpx.Response`` carrying a fixed JSON payload."""
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        self._payload = payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict[str, Any]:
+        return self._payload
+
+
+class _FakeHTTP:
+    """Stand-in for ``httpx.AsyncClient`` that records each POST."""
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        self._payload = payload
+        self.calls: list[dict[str, Any]] = []
+
+    async def post(self, url: str, **kwargs: Any) -> _FakeResponse:
+        self.calls.append(kwargs)
+        return _FakeResponse(self._payload)
+
+
+class _FakeOllama:
+    """Stand-in for ``ollama.AsyncClient`` that records each chat call."""
+
+    def __init__(self, content: str) -> None:
+        self._content = content
+        self.calls: list[dict[str, Any]] = []
+
+    async def chat(self, **kwargs: Any) -> SimpleNamespace:
+        self.calls.append(kwargs)
+        return SimpleNamespace(message=SimpleNamespace(content=self._content))
+
+
+def _reply(text: str) -> Any:
+    """Build a stand-in for ``LLMClient.chat`` that always returns ``text``."""
+
+    async def chat(*_: Any, **__: Any) -> str:
+        return text
+
+    return chat
+
+
+class TestLLMClient:
+    """Tests for LLMClient."""
 
     def test_client_init(self, ollama_config: LLMConfig) -> None:
         """Test client initialisation."""
@@ -79,36 +136,40 @@ class TestLLMClient:
         assert "unsupported" in exc_info.value.message.lower()
 
     @pytest.mark.asyncio
-    async def test_chat_json_parses_valid_json(self, ollama_config: LLMConfig) -> None:
+    async def test_chat_json_parses_valid_json(self, ollama_config: LLMConfig, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test that chat_json parses valid JSON responses."""
         client = LLMClient(ollama_config)
 
-        # Mock the chat method
-        with patch.object(client, "chat", return_value='{"key": "value"}'):
-            result = await client.chat_json([{"role": "user", "content": "test"}])
+        monkeypatch.setattr(client, "chat", _reply('{"key": "value"}'))
+
+        result = await client.chat_json([{"role": "user", "content": "test"}])
 
         assert result == {"key": "value"}
 
     @pytest.mark.asyncio
-    async def test_chat_json_extracts_from_code_block(self, ollama_config: LLMConfig) -> None:
+    async def test_chat_json_extracts_from_code_block(
+        self, ollama_config: LLMConfig, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Test that chat_json extracts JSON from markdown code blocks."""
         client = LLMClient(ollama_config)
 
-        # Mock the chat method to return JSON in code block
-        with patch.object(client, "chat", return_value='```json\n{"key": "value"}\n```'):
-            result = await client.chat_json([{"role": "user", "content": "test"}])
+        monkeypatch.setattr(client, "chat", _reply('```json\n{"key": "value"}\n```'))
+
+        result = await client.chat_json([{"role": "user", "content": "test"}])
 
         assert result == {"key": "value"}
 
     @pytest.mark.asyncio
-    async def test_chat_json_raises_on_invalid_json(self, ollama_config: LLMConfig) -> None:
+    async def test_chat_json_raises_on_invalid_json(
+        self, ollama_config: LLMConfig, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Test that chat_json raises on unparseable response."""
         client = LLMClient(ollama_config)
 
-        # Mock the chat method to return invalid JSON
-        with patch.object(client, "chat", return_value="not valid json at all"):
-            with pytest.raises(ProviderError) as exc_info:
-                await client.chat_json([{"role": "user", "content": "test"}])
+        monkeypatch.setattr(client, "chat", _reply("not valid json at all"))
+
+        with pytest.raises(ProviderError) as exc_info:
+            await client.chat_json([{"role": "user", "content": "test"}])
 
         assert "JSON" in exc_info.value.message
 
@@ -138,194 +199,112 @@ class TestLLMClient:
         call_args = mock_chat.call_args[0][0]
         assert "100" in call_args[0]["content"]
 
-    def test_extract_json_from_plain_json(self, ollama_config: LLMConfig) -> None:
-        """Test extracting plain JSON."""
-        client = LLMClient(ollama_config)
-
-        result = client._extract_json('{"key": "value"}')
-
-        assert result == {"key": "value"}
-
-    def test_extract_json_from_json_code_block(self, ollama_config: LLMConfig) -> None:
-        """Test extracting JSON from ```json block."""
-        client = LLMClient(ollama_config)
-
-        content = '```json\n{"key": "value"}\n```'
-        result = client._extract_json(content)
-
-        assert result == {"key": "value"}
-
-    def test_extract_json_from_generic_code_block(self, ollama_config: LLMConfig) -> None:
-        """Test extracting JSON from generic ``` block."""
-        client = LLMClient(ollama_config)
-
-        content = '```\n{"key": "value"}\n```'
-        result = client._extract_json(content)
-
-        assert result == {"key": "value"}
-
-    def test_extract_json_returns_none_for_invalid(self, ollama_config: LLMConfig) -> None:
-        """Test that _extract_json returns None for invalid content."""
-        client = LLMClient(ollama_config)
-
-        result = client._extract_json("not json at all")
-
-        assert result is None
+    @pytest.mark.parametrize(
+        ("content", "expected"),
+        [
+            pytest.param('{"key": "value"}', {"key": "value"}, id="plain-json"),
+            pytest.param('```json\n{"key": "value"}\n```', {"key": "value"}, id="json-code-block"),
+            pytest.param('```\n{"key": "value"}\n```', {"key": "value"}, id="generic-code-block"),
+            pytest.param("not json at all", None, id="invalid"),
+        ],
+    )
+    def test_extract_json(self, ollama_client: LLMClient, content: str, expected: dict | None) -> None:
+        """Test extracting JSON from plain and fenced responses, and None for anything else."""
+        assert ollama_client._extract_json(content) == expected
 
 
 class TestLLMClientOllama:
     """Tests for Ollama-specific LLMClient methods."""
 
-    @pytest.fixture
-    def config(self) -> LLMConfig:
-        """Create Ollama config."""
-        return LLMConfig(
-            provider="ollama",
-            model="qwen3:8b",
-            base_url="http://localhost:11434",
-        )
-
     @pytest.mark.asyncio
-    async def test_chat_ollama_success(self, config: LLMConfig) -> None:
+    async def test_chat_ollama_success(self, ollama_config: LLMConfig) -> None:
         """Test successful Ollama chat call."""
-        client = LLMClient(config)
-
-        # Mock the Ollama client
-        mock_response = MagicMock()
-        mock_response.message.content = "Response text"
+        client = LLMClient(ollama_config)
 
-        mock_ollama = AsyncMock()
-        mock_ollama.chat.return_value = mock_response
+        ollama = _FakeOllama("Response text")
+        client._ollama_client = ollama
 
-        with patch.object(client, "_get_ollama_client", return_value=mock_ollama):
-            result = await client.chat([{"role": "user", "content": "Hello"}])
+        result = await client.chat([{"role": "user", "content": "Hello"}])
 
         assert result == "Response text"
-        mock_ollama.chat.assert_called_once()
+        assert len(ollama.calls) == 1
 
     @pytest.mark.asyncio
-    async def test_chat_ollama_json_mode(self, config: LLMConfig) -> None:
+    async def test_chat_ollama_json_mode(self, ollama_config: LLMConfig) -> None:
         """Test Ollama chat with JSON mode enabled."""
-        client = LLMClient(config)
-
-        mock_response = MagicMock()
-        mock_response.message.content = '{"result": true}'
+        client = LLMClient(ollama_config)
 
-        mock_ollama = AsyncMock()
-        mock_ollama.chat.return_value = mock_response
+        ollama = _FakeOllama('{"result": true}')
+        client._ollama_client = ollama
 
-        with patch.object(client, "_get_ollama_client", return_value=mock_ollama):
-            await client.chat([{"role": "user", "content": "Return JSON"}], json_mode=True)
+        await client.chat([{"role": "user", "content": "Return JSON"}], json_mode=True)
 
         # Verify format="json" was passed
-        call_kwargs = mock_ollama.chat.call_args[1]
-        assert call_kwargs.get("format") == "json"
+        assert ollama.calls[0].get("format") == "json"
 
 
 class TestLLMClientOpenAI:
     """Tests for OpenAI-specific LLMClient methods."""
 
-    @pytest.fixture
-    def config(self) -> LLMConfig:
-        """Create OpenAI config."""
-        return LLMConfig(
-            provider="openai",
-            model="gpt-4o-mini",
-            base_url="https://api.openai.com",
-            api_key="sk-test",
-        )
-
     @pytest.mark.asyncio
-    async def test_chat_openai_success(self, config: LLMConfig) -> None:
+    async def test_chat_openai_success(self, openai_config: LLMConfig) -> None:
         """Test successful OpenAI chat call."""
-        client = LLMClient(config)
-
-        mock_response = MagicMock()
-        mock_response.json.return_value = {"choices": [{"message": {"content": "OpenAI response"}}]}
-        mock_response.raise_for_status = MagicMock()
+        client = LLMClient(openai_config)
 
-        mock_http = AsyncMock()
-        mock_http.post.return_value = mock_response
+        http = _FakeHTTP({"choices": [{"message": {"content": "OpenAI response"}}]})
+        client._http_client = http  # type: ignore[assignment]
 
-        with patch.object(client, "_get_http_client", return_value=mock_http):
-            result = await client.chat([{"role": "user", "content": "Hello"}])
+        result = await client.chat([{"role": "user", "content": "Hello"}])
 
         assert result == "OpenAI response"
 
     @pytest.mark.asyncio
-    async def test_chat_openai_json_mode(self, config: LLMConfig) -> None:
+    async def test_chat_openai_json_mode(self, openai_config: LLMConfig) -> None:
         """Test OpenAI chat with JSON mode enabled."""
-        client = LLMClient(config)
-
-        mock_response = MagicMock()
-        mock_response.json.return_value = {"choices": [{"message": {"content": '{"result": true}'}}]}
-        mock_response.raise_for_status = MagicMock()
+        client = LLMClient(openai_config)
 
-        mock_http = AsyncMock()
-        mock_http.post.return_value = mock_response
+        http = _FakeHTTP({"choices": [{"message": {"content": '{"result": true}'}}]})
+        client._http_client = http  # type: ignore[assignment]
 
-        with patch.object(client, "_get_http_client", return_value=mock_http):
-            await client.chat([{"role": "user", "content": "Return JSON"}], json_mode=True)
+        await client.chat([{"role": "user", "content": "Return JSON"}], json_mode=True)
 
         # Verify response_format was passed
-        call_kwargs = mock_http.post.call_args[1]
-        request_body = call_kwargs.get("json", {})
+        request_body = http.calls[0].get("json", {})
         assert request_body.get("response_format") == {"type": "json_object"}
 
 
 class TestLLMClientAnthropic:
     """Tests for Anthropic-specific LLMClient methods."""
 
-    @pytest.fixture
-    def config(self) -> LLMConfig:
-        """Create Anthropic config."""
-        return LLMConfig(
-            provider="anthropic",
-            model="claude-sonnet-4-20250514",
-            base_url="https://api.anthropic.com",
-            api_key="sk-ant-test",
-        )
-
     @pytest.mark.asyncio
-    async def test_chat_anthropic_success(self, config: LLMConfig) -> None:
+    async def test_chat_anthropic_success(self, anthropic_config: LLMConfig) -> None:
         """Test successful Anthropic chat call."""
-        client = LLMClient(config)
-
-        mock_response = MagicMock()
-        mock_response.json.return_value = {"content": [{"text": "Anthropic response"}]}
-        mock_response.raise_for_status = MagicMock()
+        client = LLMClient(anthropic_config)
 
-        mock_http = AsyncMock()
-        mock_http.post.return_value = mock_response
+        http = _FakeHTTP({"content": [{"text": "Anthropic response"}]})
+        client._http_client = http  # type: ignore[assignment]
 
-        with patch.object(client, "_get_http_client", return_value=mock_http):
-            result = await client.chat([{"role": "user", "content": "Hello"}])
+        result = await client.chat([{"role": "user", "content": "Hello"}])
 
         assert result == "Anthropic response"
 
     @pytest.mark.asyncio
-    async def test_chat_anthropic_extracts_system_message(self, config: LLMConfig) -> None:
+    async def test_chat_anthropic_extracts_system_message(self, anthropic_config: LLMConfig) -> None:
         """Test that Anthropic chat extracts system message."""
-        client = LLMClient(config)
-
-        mock_response = MagicMock()
-        mock_response.json.return_value = {"content": [{"text": "Response"}]}
-        mock_response.raise_for_status = MagicMock()
+        client = LLMClient(anthropic_config)
 
-        mock_http = AsyncMock()
-        mock_http.post.return_value = mock_response
+        http = _FakeHTTP({"content": [{"text": "Response"}]})
+        client._http_client = http  # type: ignore[assignment]
 
         messages = [
             {"role": "system", "content": "You are helpful"},
             {"role": "user", "content": "Hello"},
         ]
 
-        with patch.object(client, "_get_http_client", return_value=mock_http):
-            await client.chat(messages)
+        await client.chat(messages)
 
         # Verify system was extracted to separate field
-        call_kwargs = mock_http.post.call_args[1]
-        request_body = call_kwargs.get("json", {})
+        request_body = http.calls[0].get("json", {})
         assert request_body.get("system") == "You are helpful"
         # User message should still be in messages array
         assert len(request_body.get("messages", [])) == 1
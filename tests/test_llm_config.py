@@ -8,6 +8,15 @@ from supacrawl.exceptions import ConfigurationError
 from supacrawl.llm import LLMConfig, LLMNotConfiguredError, is_llm_configured, load_llm_config
 
 
+def _env(monkeypatch: pytest.MonkeyPatch, **values: str | None) -> None:
+    """Set each variable to its value, or unset it when the value is None."""
+    for name, value in values.items():
+        if value is None:
+            monkeypatch.delenv(name, raising=False)
+        else:
+            monkeypatch.setenv(name, value)
+
+
 class TestLLMConfig:
     """Tests for LLMConfig dataclass."""
 
@@ -41,22 +50,19 @@ class TestIsLLMConfigured:
 
     def test_returns_false_when_provider_not_set(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test returns False when SUPACRAWL_LLM_PROVIDER is not set."""
-        monkeypatch.delenv("SUPACRAWL_LLM_PROVIDER", raising=False)
-        monkeypatch.delenv("SUPACRAWL_LLM_MODEL", raising=False)
+        _env(monkeypatch, SUPACRAWL_LLM_PROVIDER=None, SUPACRAWL_LLM_MODEL=None)
 
         assert is_llm_configured() is False
 
     def test_returns_false_when_model_not_set(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test returns False when SUPACRAWL_LLM_MODEL is not set."""
-        monkeypatch.setenv("SUPACRAWL_LLM_PROVIDER", "ollama")
-        monkeypatch.delenv("SUPACRAWL_LLM_MODEL", raising=False)
+        _env(monkeypatch, SUPACRAWL_LLM_PROVIDER="ollama", SUPACRAWL_LLM_MODEL=None)
 
         assert is_llm_configured() is False
 
     def test_returns_true_when_both_set(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test returns True when both provider and model are set."""
-        monkeypatch.setenv("SUPACRAWL_LLM_PROVIDER", "ollama")
-        monkeypatch.setenv("SUPACRAWL_LLM_MODEL", "qwen3:8b")
+        _env(monkeypatch, SUPACRAWL_LLM_PROVIDER="ollama", SUPACRAWL_LLM_MODEL="qwen3:8b")
 
         assert is_llm_configured() is True
 
@@ -66,8 +72,7 @@ class TestLoadLLMConfig:
 
     def test_raises_when_provider_not_set(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test raises LLMNotConfiguredError when provider not set."""
-        monkeypatch.delenv("SUPACRAWL_LLM_PROVIDER", raising=False)
-        monkeypatch.delenv("SUPACRAWL_LLM_MODEL", raising=False)
+        _env(monkeypatch, SUPACRAWL_LLM_PROVIDER=None, SUPACRAWL_LLM_MODEL=None)
 
         with pytest.raises(LLMNotConfiguredError) as exc_info:
             load_llm_config()
@@ -78,8 +83,7 @@ class TestLoadLLMConfig:
 
     def test_raises_when_model_not_set(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test raises LLMNotConfiguredError when model not set."""
-        monkeypatch.setenv("SUPACRAWL_LLM_PROVIDER", "ollama")
-        monkeypatch.delenv("SUPACRAWL_LLM_MODEL", raising=False)
+        _env(monkeypatch, SUPACRAWL_LLM_PROVIDER="ollama", SUPACRAWL_LLM_MODEL=None)
 
         with pytest.raises(LLMNotConfiguredError) as exc_info:
             load_llm_config()
@@ -89,9 +93,7 @@ class TestLoadLLMConfig:
 
     def test_raises_when_openai_api_key_not_set(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test raises ConfigurationError when OpenAI API key not set."""
-        monkeypatch.setenv("SUPACRAWL_LLM_PROVIDER", "openai")
-        monkeypatch.setenv("SUPACRAWL_LLM_MODEL", "gpt-4o-mini")
-        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        _env(monkeypatch, SUPACRAWL_LLM_PROVIDER="openai", SUPACRAWL_LLM_MODEL="gpt-4o-mini", OPENAI_API_KEY=None)
 
         with pytest.raises(ConfigurationError) as exc_info:
             load_llm_config()
@@ -101,9 +103,12 @@ class TestLoadLLMConfig:
 
     def test_raises_when_anthropic_api_key_not_set(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test raises ConfigurationError when Anthropic API key not set."""
-        monkeypatch.setenv("SUPACRAWL_LLM_PROVIDER", "anthropic")
-        monkeypatch.setenv("SUPACRAWL_LLM_MODEL", "claude-sonnet-4-20250514")
-        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        _env(
+            monkeypatch,
+            SUPACRAWL_LLM_PROVIDER="anthropic",
+            SUPACRAWL_LLM_MODEL="claude-sonnet-4-20250514",
+            ANTHROPIC_API_KEY=None,
+        )
 
         with pytest.raises(ConfigurationError) as exc_info:
             load_llm_config()
@@ -113,8 +118,7 @@ class TestLoadLLMConfig:
 
     def test_raises_for_invalid_provider(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test raises ConfigurationError for unsupported provider."""
-        monkeypatch.setenv("SUPACRAWL_LLM_PROVIDER", "unsupported")
-        monkeypatch.setenv("SUPACRAWL_LLM_MODEL", "model")
+        _env(monkeypatch, SUPACRAWL_LLM_PROVIDER="unsupported", SUPACRAWL_LLM_MODEL="model")
 
         with pytest.raises(ConfigurationError) as exc_info:
             load_llm_config()
@@ -122,50 +126,57 @@ class TestLoadLLMConfig:
         error = exc_info.value
         assert "unsupported" in error.message.lower() or "invalid" in error.message.lower()
 
-    def test_loads_ollama_config(self, monkeypatch: pytest.MonkeyPatch) -> None:
-        """Test loading Ollama configuration."""
-        monkeypatch.setenv("SUPACRAWL_LLM_PROVIDER", "ollama")
-        monkeypatch.setenv("SUPACRAWL_LLM_MODEL", "qwen3:8b")
-        monkeypatch.delenv("OLLAMA_HOST", raising=False)
-
-        config = load_llm_config()
-
-        assert config.provider == "ollama"
-        assert config.model == "qwen3:8b"
-        assert config.base_url == "http://localhost:11434"
-        assert config.api_key is None
-
-    def test_loads_openai_config(self, monkeypatch: pytest.MonkeyPatch) -> None:
-        """Test loading OpenAI configuration."""
-        monkeypatch.setenv("SUPACRAWL_LLM_PROVIDER", "openai")
-        monkeypatch.setenv("SUPACRAWL_LLM_MODEL", "gpt-4o-mini")
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-
-        config = load_llm_config()
-
-        assert config.provider == "openai"
-        assert config.model == "gpt-4o-mini"
-        assert config.base_url == "https://api.openai.com"
-        assert config.api_key == "sk-test-key"
-
-    def test_loads_anthropic_config(self, monkeypatch: pytest.MonkeyPatch) -> None:
-        """Test loading Anthropic configuration."""
-        monkeypatch.setenv("SUPACRAWL_LLM_PROVIDER", "anthropic")
-        monkeypatch.setenv("SUPACRAWL_LLM_MODEL", "claude-sonnet-4-20250514")
-        monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-test")
-
-        config = load_llm_config()
-
-        assert config.provider == "anthropic"
-        assert config.model == "claude-sonnet-4-20250514"
-        assert config.base_url == "https://api.anthropic.com"
-        assert config.api_key == "sk-ant-test"
+    @pytest.mark.parametrize(
+        ("env", "expected"),
+        [
+            pytest.param(
+                {"SUPACRAWL_LLM_PROVIDER": "ollama", "SUPACRAWL_LLM_MODEL": "qwen3:8b", "OLLAMA_HOST": None},
+                LLMConfig(provider="ollama", model="qwen3:8b", base_url="http://localhost:11434"),
+                id="ollama",
+            ),
+            pytest.param(
+                {
+                    "SUPACRAWL_LLM_PROVIDER": "openai",
+                    "SUPACRAWL_LLM_MODEL": "gpt-4o-mini",
+                    "OPENAI_API_KEY": "sk-test-key",
+                },
+                LLMConfig(
+                    provider="openai", model="gpt-4o-mini", base_url="https://api.openai.com", api_key="sk-test-key"
+                ),
+                id="openai",
+            ),
+            pytest.param(
+                {
+                    "SUPACRAWL_LLM_PROVIDER": "anthropic",
+                    "SUPACRAWL_LLM_MODEL": "claude-sonnet-4-20250514",
+                    "ANTHROPIC_API_KEY": "sk-ant-test",
+                },
+                LLMConfig(
+                    provider="anthropic",
+                    model="claude-sonnet-4-20250514",
+                    base_url="https://api.anthropic.com",
+                    api_key="sk-ant-test",
+                ),
+                id="anthropic",
+            ),
+        ],
+    )
+    def test_loads_provider_config(
+        self, monkeypatch: pytest.MonkeyPatch, env: dict[str, str | None], expected: LLMConfig
+    ) -> None:
+        """Test loading each provider's configuration, with its default base URL."""
+        _env(monkeypatch, **env)
+
+        assert load_llm_config() == expected
 
     def test_ollama_host_overrides_default(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test that OLLAMA_HOST overrides default Ollama URL."""
-        monkeypatch.setenv("SUPACRAWL_LLM_PROVIDER", "ollama")
-        monkeypatch.setenv("SUPACRAWL_LLM_MODEL", "qwen3:8b")
-        monkeypatch.setenv("OLLAMA_HOST", "http://remote-ollama:11434")
+        _env(
+            monkeypatch,
+            SUPACRAWL_LLM_PROVIDER="ollama",
+            SUPACRAWL_LLM_MODEL="qwen3:8b",
+            OLLAMA_HOST="http://remote-ollama:11434",
+        )
 
         config = load_llm_config()
 
@@ -173,8 +184,7 @@ class TestLoadLLMConfig:
 
     def test_error_message_includes_examples(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test that error message includes helpful examples."""
-        monkeypatch.delenv("SUPACRAWL_LLM_PROVIDER", raising=False)
-        monkeypatch.delenv("SUPACRAWL_LLM_MODEL", raising=False)
+        _env(monkeypatch, SUPACRAWL_LLM_PROVIDER=None, SUPACRAWL_LLM_MODEL=None)
 
         with pytest.raises(LLMNotConfiguredError) as exc_info:
             load_llm_config()
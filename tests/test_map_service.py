@@ -1,61 +1,80 @@
 """Tests for map service."""
 
+from collections.abc import AsyncIterator
+
 import pytest
+import pytest_asyncio
 
 from supacrawl.models import MapLink, MapResult
+from supacrawl.services.browser import BrowserManager
 from supacrawl.services.map import MapService
 
 
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def shared_browser(cdp_url: str | None) -> AsyncIterator[BrowserManager]:
+    """One browser for the module's map runs; without it every map_all launches and closes its own.
+
+    Left unstarted: MapService starts a shared browser on first use and reports a
+    failed launch as a failed map, as it does for a browser it creates itself.
+    """
+    browser = BrowserManager(cdp_url=cdp_url)
+    try:
+        yield browser
+    finally:
+        await browser.stop()
+
+
+@pytest.fixture(scope="module")
+def map_service(shared_browser: BrowserManager) -> MapService:
+    """A MapService on the shared browser; it holds no other per-run state."""
+    return MapService(browser=shared_browser)
+
+
 class TestMapService:
     """Tests for MapService."""
 
     @pytest.mark.e2e
-    @pytest.mark.asyncio
-    async def test_map_all_returns_result(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_map_all_returns_result(self, map_service: MapService):
         """Test that map_all returns a MapResult."""
-        service = MapService()
-        result = await service.map_all("https://example.com", limit=5)
+        result = await map_service.map_all("https://example.com", limit=5)
         assert isinstance(result, MapResult)
         assert result.success is True or result.error is not None
 
     @pytest.mark.e2e
-    @pytest.mark.asyncio
-    async def test_map_all_returns_links(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_map_all_returns_links(self, map_service: MapService):
         """Test that map_all returns discovered links."""
-        service = MapService()
-        result = await service.map_all("https://example.com", limit=10)
+        result = await map_service.map_all("https://example.com", limit=10)
         assert isinstance(result, MapResult)
         if result.success:
             assert len(result.links) > 0
             assert all(isinstance(link, MapLink) for link in result.links)
 
     @pytest.mark.e2e
-    @pytest.mark.asyncio
-    async def test_map_all_respects_limit(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_map_all_respects_limit(self, map_service: MapService):
         """Test that map_all respects URL limit."""
-        service = MapService()
-        result = await service.map_all("https://example.com", limit=5)
+        result = await map_service.map_all("https://example.com", limit=5)
         if result.success:
             assert len(result.links) <= 5
 
     @pytest.mark.e2e
-    @pytest.mark.asyncio
-    async def test_map_all_extracts_titles(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_map_all_extracts_titles(self, map_service: MapService):
         """Test that map_all extracts page titles."""
-        service = MapService()
-        result = await service.map_all("https://example.com", limit=3)
+        result = await map_service.map_all("https://example.com", limit=3)
         if result.success and result.links:
             # At least one link should have a title
             titles = [link.title for link in result.links if link.title]
             assert len(titles) >= 0  # May be empty for some sites
 
     @pytest.mark.e2e
-    @pytest.mark.asyncio
-    async def test_map_streaming_yields_events(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_map_streaming_yields_events(self, map_service: MapService):
         """Test that map() yields progress events as an async generator."""
-        service = MapService()
         events = []
-        async for event in service.map("https://example.com", limit=3):
+        async for event in map_service.map("https://example.com", limit=3):
             events.append(event)
         # Should have at least a complete or error event
         event_types = [e.type for e in events]
@@ -75,54 +94,49 @@ class TestMapService:
         assert not service._is_same_domain("https://other.com/page", "example.com", True)
 
     @pytest.mark.e2e
-    @pytest.mark.asyncio
-    async def test_search_filter(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_search_filter(self, map_service: MapService):
         """Test URL filtering with search."""
-        service = MapService()
-        result = await service.map_all("https://example.com", limit=100, search="about")
+        result = await map_service.map_all("https://example.com", limit=100, search="about")
         if result.success:
             # All URLs should contain "about" (case insensitive)
             for link in result.links:
                 assert "about" in link.url.lower(), f"URL '{link.url}' does not contain 'about'"
 
     @pytest.mark.e2e
-    @pytest.mark.asyncio
-    async def test_sitemap_only_mode(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_sitemap_only_mode(self, map_service: MapService):
         """Test sitemap-only discovery mode."""
-        service = MapService()
-        result = await service.map_all("https://example.com", limit=10, sitemap="only", max_depth=0)
+        result = await map_service.map_all("https://example.com", limit=10, sitemap="only", max_depth=0)
         # Should succeed or fail gracefully
         assert isinstance(result, MapResult)
 
     @pytest.mark.e2e
-    @pytest.mark.asyncio
-    async def test_sitemap_skip_mode(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_sitemap_skip_mode(self, map_service: MapService):
         """Test sitemap skip mode (BFS only)."""
-        service = MapService()
-        result = await service.map_all("https://example.com", limit=5, sitemap="skip")
+        result = await map_service.map_all("https://example.com", limit=5, sitemap="skip")
         # Should succeed or fail gracefully
         assert isinstance(result, MapResult)
 
     @pytest.mark.e2e
-    @pytest.mark.asyncio
-    async def test_allow_external_links_default_false(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_allow_external_links_default_false(self, map_service: MapService):
         """Test that external links are excluded by default."""
-        service = MapService()
-        result = await service.map_all("https://example.com", limit=10, sitemap="skip")
+        result = await map_service.map_all("https://example.com", limit=10, sitemap="skip")
         if result.success:
             # All URLs should be from example.com (no external)
             for link in result.links:
                 assert "example.com" in link.url, f"External link found: {link.url}"
 
     @pytest.mark.e2e
-    @pytest.mark.asyncio
-    async def test_allow_external_links_enabled(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_allow_external_links_enabled(self, map_service: MapService):
         """Test that external links are allowed when enabled."""
-        service = MapService()
         # This test verifies the parameter is accepted; actual external link
         # discovery depends on the source page having external links. A small
         # limit keeps it from following links deep across external sites.
-        result = await service.map_all(
+        result = await map_service.map_all(
             "https://example.com",
             limit=2,
             sitemap="skip",
@@ -5,7 +5,8 @@ import inspect
 import pytest
 
 from supacrawl.models import ScrapeResult
-from supacrawl.services.scrape import ScrapeService
+from supacrawl.services.converter import _CONVERT_CACHE_SIZE, MarkdownConverter
+from supacrawl.services.scrape import _SCRAPE_CONVERT_CACHE_SIZE, ScrapeService
 
 
 class TestScrapeServiceSignature:
@@ -19,6 +20,22 @@ class TestScrapeServiceSignature:
         assert params["proxy"].default is None
 
 
+class TestScrapeServiceConverter:
+    """The converter a ScrapeService builds for itself lives as long as the service."""
+
+    def test_own_converter_keeps_a_small_conversion_cache(self) -> None:
+        """A long-lived MCP/API service must not retain MarkdownConverter's default
+        1024 complete markdown outputs."""
+        service = ScrapeService()
+        assert service._converter._cache_size == _SCRAPE_CONVERT_CACHE_SIZE
+        assert _SCRAPE_CONVERT_CACHE_SIZE < _CONVERT_CACHE_SIZE
+
+    def test_injected_converter_is_used_as_is(self) -> None:
+        """A caller-supplied converter keeps whatever cache size it was built with."""
+        converter = MarkdownConverter()
+        assert ScrapeService(converter=converter)._converter is converter
+
+
 @pytest.mark.e2e
 class TestScrapeService:
     """Tests for ScrapeService (E2E - require browser/network)."""